@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import asyncio
+import argparse
+from core.stats import summarize_latencies
+from client import bootstrap, load_tools, build_agents, answer_question, tool_stats, close_tools
+
+
+def question_id(record: dict, line_no: int) -> str:
+    if record.get("id") is not None:
+        return str(record["id"])
+    digest = hashlib.sha1(record["question"].encode("utf-8")).hexdigest()[:12]
+    return f"{line_no}-{digest}"
+
+
+def load_questions(path: str) -> list[dict]:
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not record.get("question"):
+                print(f"- ⚠️ Skipping line {line_no}: missing 'question'")
+                continue
+            questions.append({**record, "id": question_id(record, line_no)})
+    return questions
+
+
+def load_completed_ids(path: str) -> set[str]:
+    """
+    Ids already written to the output file; a truncated last line from an
+    interrupted run is ignored so that question is retried.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("error") is None:
+                done.add(str(record["id"]))
+    return done
+
+
+async def run_batch(input_path: str, output_path: str, concurrency: int, timeout: float):
+    questions = load_questions(input_path)
+    completed_ids = load_completed_ids(output_path)
+    pending = [q for q in questions if q["id"] not in completed_ids]
+
+    print(
+        f"\n📋 {len(questions)} questions, {len(questions) - len(pending)} already done, "
+        f"{len(pending)} to run with concurrency {concurrency}"
+    )
+    if not pending:
+        return
+
+    agents = build_agents(await load_tools())
+    slots = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def run_one(record: dict):
+            nonlocal errors
+            async with slots:
+                t0 = time.perf_counter()
+                result = {"id": record["id"], "question": record["question"], "error": None}
+                try:
+                    result.update(
+                        await asyncio.wait_for(
+                            answer_question(agents, record["question"]), timeout=timeout
+                        )
+                    )
+                except Exception as e:
+                    errors += 1
+                    result["error"] = repr(e)
+                total_ms = round((time.perf_counter() - t0) * 1000, 1)
+                result.setdefault("timings", {})["total_ms"] = total_ms
+                if result["error"] is None:
+                    latencies.append(total_ms)
+
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+
+                done = len(latencies) + errors
+                if done % 10 == 0 or done == len(pending):
+                    print(f"- 🕞 {done}/{len(pending)} done ({errors} errors)")
+
+        await asyncio.gather(*(run_one(record) for record in pending))
+
+    summary = summarize_latencies(latencies, time.perf_counter() - started)
+    summary["errors"] = errors
+    summary["mcp"] = tool_stats()
+    await close_tools()
+    print("\n📊 Batch summary:", json.dumps(summary, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a JSONL file of questions through the RAG pipeline."
+    )
+    parser.add_argument("input", help="JSONL with one {'id'?, 'question'} per line")
+    parser.add_argument("output", help="JSONL results file (appended to; used for resume)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-question seconds")
+    parser.add_argument("--skip-bootstrap", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.skip_bootstrap:
+        bootstrap()
+    asyncio.run(run_batch(args.input, args.output, args.concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import sys
+import json
+import time
+import argparse
+import faiss
+import numpy as np
+from core.ann_index import create_index, set_search_params
+
+
+def make_corpus(n: int, dim: int, n_queries: int, seed: int = 0):
+    """
+    Clustered synthetic vectors (normalized, like sentence embeddings) plus
+    queries drawn from the same distribution.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(16, n // 1000), dim)).astype(np.float32)
+
+    def sample(count):
+        points = centers[rng.integers(0, len(centers), count)]
+        points = points + 0.4 * rng.normal(size=(count, dim)).astype(np.float32)
+        faiss.normalize_L2(points)
+        return points
+
+    return sample(n), sample(n_queries)
+
+
+def measure(index, queries: np.ndarray, k: int, truth: np.ndarray = None) -> dict:
+    started = time.perf_counter()
+    _, labels = index.search(queries, k)
+    batch_s = time.perf_counter() - started
+
+    single_n = min(200, len(queries))
+    started = time.perf_counter()
+    for i in range(single_n):
+        index.search(queries[i : i + 1], k)
+    single_s = time.perf_counter() - started
+
+    result = {
+        "qps_batch": round(len(queries) / batch_s, 1),
+        "qps_single": round(single_n / single_s, 1),
+        "latency_single_ms": round(single_s / single_n * 1000, 3),
+    }
+    if truth is not None:
+        hits = sum(len(set(row) & set(expected)) for row, expected in zip(labels, truth))
+        result["recall_at_k"] = round(hits / truth.size, 4)
+    return result, labels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recall@k / QPS / memory of ANN index types versus the flat index."
+    )
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    vectors, queries = make_corpus(args.n, args.dim, args.queries)
+    ids = np.arange(args.n, dtype=np.int64)
+    specs = [
+        {"type": "flat"},
+        {"type": "ivf_flat", "nlist": args.nlist},
+        {"type": "ivf_pq", "nlist": args.nlist, "pq_m": args.pq_m},
+        {"type": "hnsw", "hnsw_m": args.hnsw_m},
+    ]
+
+    results = []
+    truth = None
+    for spec in specs:
+        started = time.perf_counter()
+        index, effective = create_index(spec, vectors)
+        index.add_with_ids(vectors, ids)
+        build_s = time.perf_counter() - started
+        memory_mb = len(faiss.serialize_index(index)) / 1024 / 1024
+
+        if effective["type"] == "flat":
+            sweep = [{}]
+        elif effective["type"] == "hnsw":
+            sweep = [{"ef_search": ef} for ef in args.ef_search]
+        else:
+            sweep = [{"nprobe": nprobe} for nprobe in args.nprobe]
+
+        for params in sweep:
+            set_search_params(index, **params)
+            metrics, labels = measure(index, queries, args.k, truth)
+            if truth is None:
+                truth = labels
+                metrics["recall_at_k"] = 1.0
+            row = {
+                "index": effective,
+                "params": params,
+                "build_s": round(build_s, 2),
+                "memory_mb": round(memory_mb, 1),
+                **metrics,
+            }
+            results.append(row)
+            print(json.dumps(row))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
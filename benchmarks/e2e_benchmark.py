@@ -0,0 +1,338 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import importlib
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SQL_QUERIES = [
+    "SELECT customerName, country, creditLimit FROM customers WHERE country = 'France'",
+    "SELECT country, COUNT(*) AS customers FROM customers GROUP BY country ORDER BY customers DESC",
+    "SELECT c.customerName, SUM(p.amount) AS total FROM customers c "
+    "JOIN payments p ON p.customerNumber = c.customerNumber "
+    "GROUP BY c.customerName ORDER BY total DESC LIMIT 10",
+    "SELECT orderNumber, orderDate, status FROM orders WHERE status = 'In Process'",
+    "SELECT pr.productLine, SUM(d.quantityOrdered * d.priceEach) AS sales FROM orderdetails d "
+    "JOIN products pr ON pr.productCode = d.productCode GROUP BY pr.productLine",
+]
+
+SERVERS = {
+    "math_search": "servers.math_search",
+    "weather_search": "servers.weather_search",
+    "sql_search": "servers.sql_search",
+    "vector_search": "servers.vector_search",
+}
+
+
+def prepare_workdir(workdir: str, scale: int, answer_cache: bool = False) -> dict:
+    """
+    Lays out a throwaway working directory (config and resources linked from
+    the repo, fresh vector_db) and points the app at hermetic stand-ins.
+    """
+    from benchmarks.fakes import build_classicmodels_sqlite
+
+    for name in ("config", "resources"):
+        os.symlink(os.path.join(REPO_ROOT, name), os.path.join(workdir, name))
+
+    db_path = os.path.join(workdir, "classicmodels.sqlite")
+    build_classicmodels_sqlite(db_path, scale=scale)
+
+    env = {
+        "DB_URL": f"sqlite:///{db_path}",
+        "EMBEDDING_BACKEND": "hashing",
+        "EMBEDDING_MODEL": "hashing-384",
+        "VECTOR_INDEX_TYPE": "flat",
+        "VECTOR_RELOAD_INTERVAL": "0",
+        "SPECULATIVE_PREFETCH": "false",
+        "MCP_HEALTH_INTERVAL": "0",
+        "TRACE_DIR": "",
+        # Off by default so repeated questions measure the full pipeline.
+        "ANSWER_CACHE_ENABLED": "true" if answer_cache else "false",
+        "ANSWER_CACHE_EMBEDDING": "hashing",
+        # Never used: the chat model is replaced before any call.
+        "GROQ_API_KEY": "hermetic-benchmark",
+        "COHERE_API_KEY": "hermetic-benchmark",
+    }
+    os.environ.update(env)
+    os.chdir(workdir)
+    return env
+
+
+async def run_concurrently(calls: list, concurrency: int) -> tuple[list[float], int, float]:
+    """
+    Runs zero-argument coroutine factories with at most `concurrency` in
+    flight; returns per-call latencies (ms), the error count and elapsed seconds.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def run(call):
+        nonlocal errors
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(call) for call in calls))
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    from core.stats import summarize_latencies
+
+    return {**summarize_latencies(latencies, elapsed), "errors": errors}
+
+
+def bench_index_build(paragraphs: int) -> dict:
+    from benchmarks.fakes import write_corpus
+    from core.vector_db import VECTOR_DB_ROOT, init_vector_db, load_manifest
+
+    os.makedirs("bench_resources", exist_ok=True)
+    corpus = os.path.join("bench_resources", "corpus.txt")
+    write_corpus(corpus, paragraphs)
+
+    started = time.perf_counter()
+    init_vector_db([corpus], None, output_file="bench_corpus")
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    init_vector_db([corpus], None, output_file="bench_corpus")
+    resync_s = time.perf_counter() - started
+
+    manifest = load_manifest(os.path.join(VECTOR_DB_ROOT, "bench_corpus"))
+    chunks = sum(len(entry["chunks"]) for entry in manifest["files"].values())
+    return {
+        "chunks": chunks,
+        "build_s": round(build_s, 3),
+        "chunks_per_s": round(chunks / build_s, 1),
+        "noop_resync_ms": round(resync_s * 1000, 2),
+    }
+
+
+def bench_vector_search(index, questions: list[str], rounds: int) -> dict:
+    import numpy as np
+
+    queries = questions * rounds
+    vectors = np.asarray(index.embeddings.embed_documents(queries), dtype=np.float32)
+
+    started = time.perf_counter()
+    for vector in vectors:
+        index.search(vector[None, :], 5)
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.search(vectors, 5)
+    batch_s = time.perf_counter() - started
+
+    return {
+        "vectors": index.index.ntotal,
+        "qps_single": round(len(queries) / single_s, 1),
+        "qps_batch": round(len(queries) / batch_s, 1),
+    }
+
+
+async def bench(args) -> dict:
+    from core.db_connector import dispose_async_db_engine
+
+    try:
+        return await _bench(args)
+    finally:
+        await dispose_async_db_engine()
+
+
+async def _bench(args) -> dict:
+    import yaml
+    import client
+    from core.intent_classifier import LocalIntentClassifier
+    from benchmarks.fakes import ScriptedChatModel
+
+    results = {}
+
+    started = time.perf_counter()
+    client.bootstrap()
+    results["bootstrap_s"] = round(time.perf_counter() - started, 3)
+
+    # init_vector_db runs its own event loop, so it cannot run on this one.
+    results["index_build"] = await asyncio.to_thread(bench_index_build, args.paragraphs)
+
+    client.llm = ScriptedChatModel(
+        classifier=LocalIntentClassifier.from_yaml("config/intent_examples.yaml"),
+        latency_ms=args.llm_latency_ms,
+    )
+
+    started = time.perf_counter()
+    servers = {name: importlib.import_module(module) for name, module in SERVERS.items()}
+    tool_config = {name: {"transport": "in_memory", "server": servers[name].mcp} for name in SERVERS}
+    tools = await client.load_tools(tool_config)
+    agents = client.build_agents(tools)
+    results["tools_startup_s"] = round(time.perf_counter() - started, 3)
+
+    with open("config/intent_examples.yaml", "r") as f:
+        questions_by_intent = yaml.safe_load(f)
+
+    results["e2e"] = {}
+    for concurrency in args.concurrency:
+        client.intent_cache = type(client.intent_cache)(client.intent_cache.max_size)
+        by_intent = {}
+        for intent, questions in questions_by_intent.items():
+            calls = [
+                (lambda q=q: client.answer_question(agents, q))
+                for q in questions * args.rounds
+            ]
+            by_intent[intent] = summarize(*await run_concurrently(calls, concurrency))
+        results["e2e"][f"c{concurrency}"] = by_intent
+        print(f"- e2e c={concurrency}: " + ", ".join(f"{i} p50 {s['p50_ms']}ms" for i, s in by_intent.items()))
+
+    knowledge = servers["vector_search"].VECTORSTORES["knowledge"].current
+    all_questions = [q for questions in questions_by_intent.values() for q in questions]
+    results["vector_index"] = bench_vector_search(knowledge, all_questions, args.rounds * 10)
+
+    vector_tool = agents["tools"]["vector_knowledge_search"]
+    sql_tool = agents["tools"]["query_database"]
+    query_cache = servers["sql_search"].query_cache
+    cache_ttl = query_cache.ttl
+
+    results["vector_tool"] = {}
+    results["sql_tool"] = {}
+    results["sql_tool_cached"] = {}
+    for concurrency in args.concurrency:
+        calls = [
+            (lambda q=q: vector_tool.ainvoke({"query": q, "top_k": 5}))
+            for q in all_questions * args.rounds
+        ]
+        results["vector_tool"][f"c{concurrency}"] = summarize(*await run_concurrently(calls, concurrency))
+
+        sql_calls = [
+            (lambda q=q: sql_tool.ainvoke({"query": q}))
+            for q in SQL_QUERIES * args.rounds * 4
+        ]
+        query_cache.clear()
+        query_cache.ttl = 0
+        results["sql_tool"][f"c{concurrency}"] = summarize(*await run_concurrently(sql_calls, concurrency))
+        query_cache.ttl = cache_ttl
+        results["sql_tool_cached"][f"c{concurrency}"] = summarize(
+            *await run_concurrently(sql_calls, concurrency)
+        )
+        print(
+            f"- tools c={concurrency}: vector {results['vector_tool'][f'c{concurrency}']['throughput_per_s']}/s, "
+            f"sql {results['sql_tool'][f'c{concurrency}']['throughput_per_s']}/s"
+        )
+
+    results["mcp"] = client.tool_stats()
+    results["answer_cache"] = client.answer_cache_stats()
+    await client.close_tools()
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists metrics that got worse than the baseline by more than `tolerance`
+    (relative). Latencies and durations should go down, rates should go up.
+    """
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for name, old in previous.items():
+        new = current.get(name)
+        if new is None or not old:
+            continue
+        leaf = name.rsplit(".", 1)[-1]
+        if leaf.endswith(("_ms", "_s")) and not leaf.endswith("per_s"):
+            worse = new > old * (1 + tolerance)
+        elif "per_s" in leaf or leaf.startswith("qps"):
+            worse = new < old * (1 - tolerance)
+        else:
+            continue
+        if worse:
+            regressions.append(f"{name}: {old} -> {new}")
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Hermetic end-to-end benchmark: scripted LLM, hashing embeddings, "
+        "SQLite classicmodels and in-process MCP servers."
+    )
+    parser.add_argument("--output", default="benchmarks/results/e2e.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rounds", type=int, default=2, help="repetitions of each question set")
+    parser.add_argument("--scale", type=int, default=1, help="size multiplier of the SQLite data")
+    parser.add_argument("--paragraphs", type=int, default=2000, help="synthetic corpus size")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--answer-cache", action="store_true", help="enable the semantic answer cache")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    sys.path.insert(0, REPO_ROOT)
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as workdir:
+        cwd = os.getcwd()
+        prepare_workdir(workdir, args.scale, args.answer_cache)
+        try:
+            results = asyncio.run(bench(args))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Results written to {output}")
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"- ❌ Regression {line}")
+        if regressions:
+            return 1
+        print("- ✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
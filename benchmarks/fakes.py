@@ -0,0 +1,253 @@
+import re
+import time
+import zlib
+import random
+import sqlite3
+import asyncio
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+CLASSIFIER_MARKER = "Classification Assistant"
+
+WORDS = (
+    "solar panel energy grid battery storage inverter sunlight photovoltaic cell "
+    "efficiency module roof installation output power degree education school "
+    "customer order payment product office employee shipment invoice credit"
+).split()
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the chat LLM. It answers the intent
+    classification prompt with the label of a local classifier, turns simple
+    math/weather questions into tool calls when tools are bound, and otherwise
+    returns a fixed-length answer. `latency_ms` simulates provider latency.
+    """
+
+    classifier: Any = None
+    latency_ms: float = 0.0
+    answer_words: int = 48
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs))])
+
+    def _respond(self, messages: list[BaseMessage], kwargs: dict) -> AIMessage:
+        system = messages[0].content if isinstance(messages[0], SystemMessage) else ""
+        last = messages[-1]
+        prompt_words = sum(len(str(m.content).split()) for m in messages)
+
+        if CLASSIFIER_MARKER in system:
+            label, _ = self.classifier.predict(last.content) if self.classifier else (None, 0.0)
+            return _message(f"<think>classify</think>{label or 'general_llm'}", prompt_words)
+
+        tool_names = {t["function"]["name"] for t in kwargs.get("tools") or []}
+        if isinstance(last, HumanMessage) and tool_names:
+            call = _tool_call(last.content, tool_names)
+            if call:
+                return AIMessage(
+                    content="",
+                    tool_calls=[call],
+                    usage_metadata=_usage(prompt_words, 8),
+                )
+
+        seed = str(last.content)
+        rng = random.Random(seed)
+        answer = " ".join(rng.choice(WORDS) for _ in range(self.answer_words))
+        return _message(f"<think>answer</think>Based on the context: {answer}", prompt_words)
+
+
+def _message(content: str, prompt_words: int) -> AIMessage:
+    return AIMessage(content=content, usage_metadata=_usage(prompt_words, len(content.split())))
+
+
+def _usage(input_tokens: int, output_tokens: int) -> dict:
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _tool_call(question: str, tool_names: set[str]) -> dict | None:
+    text = question.lower()
+    numbers = [int(n) for n in re.findall(r"\d+", text)][:2]
+
+    if "weather" in text and "get_weather" in tool_names:
+        match = re.search(r"\b(?:in|for) ([A-Z][\w ]+?)(?: today)?[?.]?$", question)
+        name, args = "get_weather", {"location": match.group(1) if match else "London"}
+    elif len(numbers) == 2:
+        if any(w in text for w in ("multipl", "times", "product")):
+            name = "math_multiply"
+        elif "divide" in text:
+            name = "math_divide"
+        else:
+            name = "math_add"
+        if name not in tool_names:
+            return None
+        args = {"a": numbers[0], "b": numbers[1]}
+    else:
+        return None
+
+    return {"name": name, "args": args, "id": f"call_{zlib.crc32(question.encode()):08x}", "type": "tool_call"}
+
+
+def build_classicmodels_sqlite(path: str, scale: int = 1, seed: int = 0):
+    """
+    Creates a SQLite copy of the classicmodels schema filled with synthetic,
+    reproducible rows (about 120 customers and 3000 order lines per scale).
+    """
+    rng = random.Random(seed)
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        DROP TABLE IF EXISTS orderdetails; DROP TABLE IF EXISTS orders;
+        DROP TABLE IF EXISTS payments; DROP TABLE IF EXISTS customers;
+        DROP TABLE IF EXISTS employees; DROP TABLE IF EXISTS offices;
+        DROP TABLE IF EXISTS products; DROP TABLE IF EXISTS productlines;
+
+        CREATE TABLE productlines (
+            productLine VARCHAR(50) PRIMARY KEY, textDescription VARCHAR(4000),
+            htmlDescription TEXT, image BLOB);
+        CREATE TABLE products (
+            productCode VARCHAR(15) PRIMARY KEY, productName VARCHAR(70) NOT NULL,
+            productLine VARCHAR(50) NOT NULL REFERENCES productlines(productLine),
+            productScale VARCHAR(10), productVendor VARCHAR(50), productDescription TEXT,
+            quantityInStock SMALLINT, buyPrice DECIMAL(10,2), MSRP DECIMAL(10,2));
+        CREATE TABLE offices (
+            officeCode VARCHAR(10) PRIMARY KEY, city VARCHAR(50), phone VARCHAR(50),
+            addressLine1 VARCHAR(50), addressLine2 VARCHAR(50), state VARCHAR(50),
+            country VARCHAR(50), postalCode VARCHAR(15), territory VARCHAR(10));
+        CREATE TABLE employees (
+            employeeNumber INTEGER PRIMARY KEY, lastName VARCHAR(50), firstName VARCHAR(50),
+            extension VARCHAR(10), email VARCHAR(100),
+            officeCode VARCHAR(10) REFERENCES offices(officeCode),
+            reportsTo INTEGER REFERENCES employees(employeeNumber), jobTitle VARCHAR(50));
+        CREATE TABLE customers (
+            customerNumber INTEGER PRIMARY KEY, customerName VARCHAR(50), contactLastName VARCHAR(50),
+            contactFirstName VARCHAR(50), phone VARCHAR(50), addressLine1 VARCHAR(50),
+            addressLine2 VARCHAR(50), city VARCHAR(50), state VARCHAR(50), postalCode VARCHAR(15),
+            country VARCHAR(50),
+            salesRepEmployeeNumber INTEGER REFERENCES employees(employeeNumber),
+            creditLimit DECIMAL(10,2));
+        CREATE TABLE payments (
+            customerNumber INTEGER REFERENCES customers(customerNumber), checkNumber VARCHAR(50),
+            paymentDate DATE, amount DECIMAL(10,2), PRIMARY KEY (customerNumber, checkNumber));
+        CREATE TABLE orders (
+            orderNumber INTEGER PRIMARY KEY, orderDate DATE, requiredDate DATE, shippedDate DATE,
+            status VARCHAR(15), comments TEXT,
+            customerNumber INTEGER REFERENCES customers(customerNumber));
+        CREATE TABLE orderdetails (
+            orderNumber INTEGER REFERENCES orders(orderNumber),
+            productCode VARCHAR(15) REFERENCES products(productCode),
+            quantityOrdered INTEGER, priceEach DECIMAL(10,2), orderLineNumber SMALLINT,
+            PRIMARY KEY (orderNumber, productCode));
+        """
+    )
+
+    lines = ["Classic Cars", "Motorcycles", "Planes", "Ships", "Trains", "Trucks and Buses", "Vintage Cars"]
+    countries = ["USA", "France", "Germany", "Spain", "UK", "Japan", "Australia", "Norway", "Italy"]
+    statuses = ["Shipped", "Shipped", "Shipped", "In Process", "On Hold", "Cancelled", "Resolved"]
+
+    db.executemany(
+        "INSERT INTO productlines VALUES (?, ?, NULL, NULL)",
+        [(line, f"{line} models and replicas.") for line in lines],
+    )
+    products = [f"S{10 + i % 90}_{1000 + i}" for i in range(110 * scale)]
+    db.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                code, f"Model {code}", rng.choice(lines), rng.choice(["1:10", "1:18", "1:24"]),
+                f"Vendor {i % 13}", "Die-cast replica.", rng.randint(0, 9000),
+                round(rng.uniform(10, 100), 2), round(rng.uniform(100, 220), 2),
+            )
+            for i, code in enumerate(products)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO offices VALUES (?, ?, ?, ?, NULL, NULL, ?, ?, ?)",
+        [(str(i + 1), f"City {i + 1}", "+1 555 0100", f"{i + 1} Main St", countries[i], "10001", "NA")
+         for i in range(7)],
+    )
+    employees = list(range(1002, 1002 + 23 * scale))
+    db.executemany(
+        "INSERT INTO employees VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                number, f"Last{number}", f"First{number}", "x100", f"e{number}@example.com",
+                str(number % 7 + 1), None if i == 0 else employees[0],
+                "President" if i == 0 else "Sales Rep",
+            )
+            for i, number in enumerate(employees)
+        ],
+    )
+    customers = list(range(103, 103 + 122 * scale))
+    db.executemany(
+        "INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, NULL, ?, NULL, ?, ?, ?, ?)",
+        [
+            (
+                number, f"Customer {number}", f"Last{number}", f"First{number}", "555-0100",
+                f"{number} Market St", f"City {number % 40}", "10001", rng.choice(countries),
+                rng.choice(employees), round(rng.uniform(0, 200000), 2),
+            )
+            for number in customers
+        ],
+    )
+    db.executemany(
+        "INSERT INTO payments VALUES (?, ?, ?, ?)",
+        [
+            (rng.choice(customers), f"CHK{i:07d}", f"200{3 + i % 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+             round(rng.uniform(1000, 100000), 2))
+            for i in range(273 * scale)
+        ],
+    )
+    orders = list(range(10100, 10100 + 326 * scale))
+    db.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, NULL, ?)",
+        [
+            (number, f"200{3 + i % 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+             f"200{3 + i % 3}-{i % 12 + 1:02d}-28", None, rng.choice(statuses), rng.choice(customers))
+            for i, number in enumerate(orders)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO orderdetails VALUES (?, ?, ?, ?, ?)",
+        [
+            (number, code, rng.randint(10, 60), round(rng.uniform(30, 200), 2), line)
+            for number in orders
+            for line, code in enumerate(rng.sample(products, 9), start=1)
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+def write_corpus(path: str, paragraphs: int, seed: int = 0):
+    """
+    Writes a synthetic text corpus of `paragraphs` paragraphs for index builds.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(paragraphs):
+            sentences = [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                for _ in range(rng.randint(3, 8))
+            ]
+            f.write(" ".join(sentences) + "\n\n")
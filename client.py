@@ -1,22 +1,21 @@
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_groq import ChatGroq
-from langchain_cohere import ChatCohere
-from langgraph.prebuilt import create_react_agent
-from typing import Annotated, List
+from typing import Annotated, Any
 from typing_extensions import TypedDict
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages, Messages
-from langgraph.prebuilt import ToolNode
-from langgraph.prebuilt import tools_condition
-from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
 
 import re
 import os
+import time
 import asyncio
+import operator
 from core.tool_loader import load_tool_config
-from core.db_connector import init_db_engine, get_db_schema
-from core.vector_db import init_vector_db
+from core.bootstrap import Readiness, run_stages
+from core.metrics import REGISTRY, current_trace, instrument, start_trace
+from core.answer_cache import SemanticAnswerCache
+from core.embeddings import HashingEmbeddings, get_embeddings
+from core.sql_utils import decode_cursor, extract_tables
+from core.streaming import ThinkFilter, strip_think
 from core.prompts.classifiers import get_classify_intent_prompt
+from core.intent_classifier import LocalIntentClassifier, ClassificationCache
 from core.enums.IntentLabel import IntentLabel
 from core.enums.ToolName import ToolName
 from dotenv import load_dotenv
@@ -40,54 +39,154 @@ if langchain_tracing_v2:
     os.environ["LANGCHAIN_TRACING_V2"] = langchain_tracing_v2
 
 
-llm = ChatGroq(model="qwen-qwq-32b")
-# llm = ChatGroq(model="llama3-8b-8192")
-# llm = ChatGroq(model="llama-3.3-70b-versatile")
-# llm = ChatGroq(model="mistral-saba-24b")
-# llm = ChatCohere(
-#     model_name="xlarge",
-#     temperature=0.5,
-#     max_tokens=512,
-# )
+# Created on first use by get_llm(); assign a chat model here to replace it.
+llm = None
 
 
-def bootstrap():
+def get_llm():
+    global llm
+    if llm is None:
+        from langchain_groq import ChatGroq
+
+        llm = ChatGroq(model="qwen-qwq-32b")
+        # llm = ChatGroq(model="llama3-8b-8192")
+        # llm = ChatGroq(model="llama-3.3-70b-versatile")
+        # llm = ChatGroq(model="mistral-saba-24b")
+        # from langchain_cohere import ChatCohere
+        # llm = ChatCohere(
+        #     model_name="xlarge",
+        #     temperature=0.5,
+        #     max_tokens=512,
+        # )
+    return llm
+
+
+# Bootstrap stages each intent needs before its graph can run.
+INTENT_REQUIRES = {
+    IntentLabel.DB_SEARCH.value: {"db", "schema", "table_index"},
+    IntentLabel.VECTOR_SEARCH.value: {"knowledge_index"},
+}
+
+readiness: Readiness | None = None
+
+
+def bootstrap_stages() -> dict:
     """
-    Initialize all resources needed before starting the RAG app.
-    - Initialize DB connection
-    - Load schemas
-    - Load metadata
-    if needed
+    {name: (fn, dependencies)} of everything needed before serving. The DB
+    engine, schema and the two vector indexes are independent except for the
+    schema needing the engine; vector indexes whose sources did not change
+    are left as they are (see init_vector_db).
     """
+    embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "96"))
+    embed_max_in_flight = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+
+    def init_db():
+        from core.db_connector import init_db_engine
 
-    try:
-        print("\n🕞 Bootstrapping...")
         init_db_engine(pool_size=10, max_overflow=10)
+
+    def load_schema():
+        # Warms the schema cache read by node_generate_sql_query.
+        from core.db_connector import get_db_schema_text
+
+        get_db_schema_text()
+
+    def build_index(file_paths: list[str], output_file: str = None):
+        from core.vector_db import init_vector_db
+
         init_vector_db(
-            file_paths=[
-                "config/table_descriptions.yaml",
-            ],
-            cohere_api_key=cohere_api_key,
-            output_file="table_descriptions",
-        )
-        init_vector_db(
-            file_paths=[
-                "resources/data.csv",
-                "resources/data.txt",
-            ],
+            file_paths=file_paths,
             cohere_api_key=cohere_api_key,
+            output_file=output_file,
+            batch_size=embed_batch_size,
+            max_in_flight=embed_max_in_flight,
         )
-        get_db_schema()
-        print("✅ Bootstrap successfully completed.")
-    except Exception as e:
-        print("❌ Exception:", e)
+
+    return {
+        "db": (init_db, []),
+        "schema": (load_schema, ["db"]),
+        "table_index": (
+            lambda: build_index(["config/table_descriptions.yaml"], "table_descriptions"),
+            [],
+        ),
+        "knowledge_index": (
+            lambda: build_index(["resources/data.csv", "resources/data.txt"]),
+            [],
+        ),
+    }
+
+
+def start_bootstrap() -> Readiness:
+    """
+    Starts all bootstrap stages concurrently in the background and returns
+    their readiness. Questions wait only for the stages their intent needs.
+    """
+    global readiness
+    print("\n🕞 Bootstrapping...")
+    readiness = run_stages(bootstrap_stages())
+    return readiness
+
+
+def bootstrap() -> Readiness:
+    """
+    Initialize all resources needed before starting the RAG app and wait for
+    them. A failed stage is reported and only fails the questions that need it.
+    """
+    started = time.perf_counter()
+    start_bootstrap().wait_all()
+
+    failed = readiness.failures()
+    for name, error in failed.items():
+        print(f"❌ Bootstrap stage {name} failed: {error}")
+    if not failed:
+        print(f"✅ Bootstrap successfully completed in {time.perf_counter() - started:.1f}s.")
+    return readiness
+
+
+async def wait_until_ready(intent: str):
+    if readiness is not None:
+        await readiness.wait(INTENT_REQUIRES.get(intent, ()))
+
+
+intent_cache = ClassificationCache(max_size=int(os.getenv("INTENT_CACHE_SIZE", "2048")))
+local_classifier = LocalIntentClassifier.from_yaml(
+    "config/intent_examples.yaml",
+    min_score=float(os.getenv("INTENT_MIN_SCORE", "0.25")),
+    min_margin=float(os.getenv("INTENT_MIN_MARGIN", "0.1")),
+)
 
 
 # Node: Classifier
 async def question_classifer(question: str) -> str:
+    """
+    Cached result first, then the local prototype classifier; the LLM is
+    only called when the local classifier is not confident.
+    """
+    started = time.perf_counter()
+    label = intent_cache.get(question)
+    source = "cache"
+
+    if not label:
+        label, score = local_classifier.predict(question)
+        source = "local"
+        if label is None:
+            print(f"[Classifier] Local score {score:.2f} below threshold, asking LLM")
+            label = await llm_question_classifer(question)
+            source = "llm"
+        intent_cache.set(question, label)
+
+    duration = time.perf_counter() - started
+    CLASSIFY_SECONDS.observe(duration, source=source)
+    CLASSIFICATIONS.inc(source=source, intent=label)
+    if trace := current_trace():
+        trace.add("classifier", started, duration, source=source, intent=label)
+    return label
+
+
+async def llm_question_classifer(question: str) -> str:
     prompt = get_classify_intent_prompt().format_messages(question=question)
-    response = await llm.ainvoke(prompt)
-    label = response.content.strip().lower()
+    response = await get_llm().ainvoke(prompt)
+    record_llm_usage("classifier", response)
 
     # Remove anything between <think>...</think>, including the tags
     label = re.sub(
@@ -106,17 +205,118 @@ async def question_classifer(question: str) -> str:
         return IntentLabel.GENERAL_LLM.value
 
 
-class State(TypedDict):
-    messages: Annotated[list, add_messages]
+NODE_SECONDS = REGISTRY.histogram(
+    "rag_node_duration_seconds", "LangGraph node execution time.", ("node",)
+)
+QUESTION_SECONDS = REGISTRY.histogram(
+    "rag_question_duration_seconds", "End-to-end time to answer a question.", ("intent",)
+)
+CLASSIFY_SECONDS = REGISTRY.histogram(
+    "rag_classify_duration_seconds", "Intent classification time.", ("source",)
+)
+CLASSIFICATIONS = REGISTRY.counter(
+    "rag_classifications_total", "Classified questions by deciding stage.", ("source", "intent")
+)
+LLM_TOKENS = REGISTRY.counter("rag_llm_tokens_total", "LLM tokens used.", ("call", "kind"))
+FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "rag_first_token_seconds", "Time from question to the first streamed answer token.", ("intent",)
+)
+
+
+def timed_node(name: str):
+    return instrument(NODE_SECONDS, name, node=name)
+
+
+def record_llm_usage(call: str, response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], call=call, kind=kind.removesuffix("_tokens"))
+
+
+# Prefetch tasks each intent's graph consumes; the rest are cancelled.
+PREFETCH_NEEDS = {
+    IntentLabel.DB_SEARCH.value: {"table_info", "schema"},
+    IntentLabel.VECTOR_SEARCH.value: {"knowledge"},
+}
+
+
+mcp_pool = None
+
+# Live data (weather, web) is never served from the cache: general_llm and
+# other_tool can call any tool, so they are not cached by default, and an
+# answer that used a live tool is never stored.
+ANSWER_CACHE_INTENTS = {
+    intent.strip()
+    for intent in os.getenv(
+        "ANSWER_CACHE_INTENTS",
+        f"{IntentLabel.DB_SEARCH.value},{IntentLabel.VECTOR_SEARCH.value}",
+    ).split(",")
+}
+LIVE_TOOLS = {ToolName.GET_WEATHER.value}
+# DB answers must not outlive the SQL result cache they were built from.
+SQL_CACHE_TTL = float(os.getenv("SQL_CACHE_TTL", "60"))
+answer_cache: SemanticAnswerCache | None = None
+
+
+def get_answer_cache() -> SemanticAnswerCache | None:
+    """
+    Created on first use (ANSWER_CACHE_ENABLED=false disables it).
+    ANSWER_CACHE_EMBEDDING selects the question embedder: "index" uses the
+    configured (cached) embedding backend, "hashing" a local lexical one.
+    """
+    global answer_cache
+    if answer_cache is not None or os.getenv("ANSWER_CACHE_ENABLED", "true").lower() != "true":
+        return answer_cache
+    if os.getenv("ANSWER_CACHE_EMBEDDING", "index") == "hashing":
+        embeddings = HashingEmbeddings(dim=1024)
+    else:
+        embeddings = get_embeddings(cohere_api_key)
+    answer_cache = SemanticAnswerCache(
+        embeddings,
+        threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")),
+        ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048")),
+    )
+    return answer_cache
 
 
-async def main():
+def answer_cache_stats() -> dict:
+    return answer_cache.stats() if answer_cache else {}
 
-    tool_config = load_tool_config("config/tool_registry.yaml")
-    client = MultiServerMCPClient(tool_config)
-    tools = await client.get_tools()
 
-    tool_map = {getattr(t, "name", f"unnamed_{i}"): t for i, t in enumerate(tools)}
+def invalidate_answers(intent: str = None, table: str = None) -> int:
+    return answer_cache.invalidate(intent=intent, table=table) if answer_cache else 0
+
+
+def prefetched(config: RunnableConfig, key: str):
+    """
+    Returns the speculative task started for `key`, or None when the graph
+    runs without prefetching.
+    """
+    return (config or {}).get("configurable", {}).get("prefetch", {}).get(key)
+
+
+async def load_tools(tool_config: dict = None) -> list:
+    """
+    Discovers the MCP tools through the shared session pool, so every tool
+    call reuses a long-lived session to its server. Must be called from the
+    event loop the tools will run on. `tool_config` defaults to
+    config/tool_registry.yaml.
+    """
+    from core.mcp_pool import MCPSessionPool
+
+    global mcp_pool
+    await close_tools()
+
+    tool_config = tool_config or load_tool_config("config/tool_registry.yaml")
+    mcp_pool = MCPSessionPool(
+        tool_config,
+        sessions_per_server=int(os.getenv("MCP_SESSIONS_PER_SERVER", "1")),
+        health_interval=float(os.getenv("MCP_HEALTH_INTERVAL", "30")),
+        connect_timeout=float(os.getenv("MCP_CONNECT_TIMEOUT", "30")),
+    )
+    tools = await mcp_pool.get_tools()
 
     print("\n📚 Discovered tools:")
     for tool in tools:
@@ -125,39 +325,102 @@ async def main():
     if not tools:
         raise RuntimeError("No tools discovered. Check MCP servers and tool config.")
 
-    llm_with_tools = llm.bind_tools(tools)
+    return tools
+
+
+def tool_stats() -> dict:
+    return mcp_pool.stats() if mcp_pool else {}
+
+
+async def close_tools():
+    if mcp_pool is not None:
+        await mcp_pool.close()
+
+
+def build_agents(tools: list) -> dict:
+    """
+    Compiles one graph per intent. The compiled graphs hold no per-question
+    state, so a single set can serve any number of concurrent questions.
+    """
+    from langgraph.graph import StateGraph, START
+    from langgraph.graph.message import add_messages
+    from langgraph.prebuilt import ToolNode, tools_condition
+
+    class State(TypedDict, total=False):
+        messages: Annotated[list, add_messages]
+        table_info: Any
+        sql_query: str
+        # Statements sent to query_database; the answer cache keys its
+        # table invalidation on them.
+        sql_executed: Annotated[list, operator.add]
+        # Names of the tools the LLM called.
+        tools_used: Annotated[list, operator.add]
+
+    tool_map = {getattr(t, "name", f"unnamed_{i}"): t for i, t in enumerate(tools)}
+
+    llm_with_tools = get_llm().bind_tools(tools)
 
     # Node: Call vector_table_search : Dynamic table description selection
-    async def node_vector_table_search(state: State):
+    @timed_node("node_vector_table_search")
+    async def node_vector_table_search(state: State, config: RunnableConfig):
         question = state["messages"][-1].content
-        tool = tool_map[ToolName.VECTOR_TABLE_SEARCH.value]
-        output = await tool.ainvoke({"query": question, "top_k": 5})
+        task = prefetched(config, "table_info")
+        output = await task if task else await fetch_table_info(tool_map, question)
         return {"table_info": output, "messages": state["messages"]}
 
+    # Node: Call vector_knowledge_search : Retrieve context from indexed documents
+    @timed_node("node_vector_knowledge_search")
+    async def node_vector_knowledge_search(state: State, config: RunnableConfig):
+        question = state["messages"][-1].content
+        task = prefetched(config, "knowledge")
+        output = await task if task else await fetch_knowledge(tool_map, question)
+        state["messages"].append({"role": "assistant", "content": str(output)})
+        return {"messages": state["messages"]}
+
     # Node: Call generate_sql_query : Generate the SQL query
-    async def node_generate_sql_query(state: State):
+    @timed_node("node_generate_sql_query")
+    async def node_generate_sql_query(state: State, config: RunnableConfig):
         question = state["messages"][-1].content
-        schema = get_db_schema()
+        task = prefetched(config, "schema")
+        schema = await task if task else await fetch_schema()
         table_info = state.get("table_info", [])
-        table_desc = "\n".join(table_info)
+        table_desc = table_info if isinstance(table_info, str) else "\n".join(table_info)
         input_prompt = f"{schema}\n\n{table_desc}"
         tool = tool_map[ToolName.GENERATE_SQL_QUERY.value]
         output = await tool.ainvoke({"question": question, "schema": input_prompt})
         return {"sql_query": output, "messages": state["messages"]}
 
     # Node: Call query_database - Execute the SQL Query
+    @timed_node("node_query_database")
     async def node_query_database(state: State):
         query = state.get("sql_query", "")
         tool = tool_map[ToolName.QUERY_DATABASE.value]
         output = await tool.ainvoke({"query": query})
         final_response = str(output)
         state["messages"].append({"role": "assistant", "content": final_response})
-        return {"messages": state["messages"]}
-
-    async def node_default_tool_call_llm(state: State):
-        response = await llm_with_tools.ainvoke(state["messages"])
+        return {"messages": state["messages"], "sql_executed": [query]}
+
+    @timed_node("node_default_tool_call_llm")
+    async def node_default_tool_call_llm(state: State, config: RunnableConfig):
+        if (config or {}).get("configurable", {}).get("stream_tokens"):
+            response = await stream_llm_response(llm_with_tools, state["messages"])
+        else:
+            response = await llm_with_tools.ainvoke(state["messages"])
+        record_llm_usage("tool_call_llm", response)
         return {"messages": state["messages"] + [response]}
 
+    tool_node = ToolNode(tools)
+
+    # Node: Execute the tool calls requested by the LLM
+    @timed_node("tools")
+    async def node_tools(state: State, config: RunnableConfig):
+        result = await tool_node.ainvoke(state, config)
+        calls = getattr(state["messages"][-1], "tool_calls", None) or []
+        queries = [
+            executed_sql(call["args"]) for call in calls if call["name"] == ToolName.QUERY_DATABASE.value
+        ]
+        return {**result, "sql_executed": queries, "tools_used": [call["name"] for call in calls]}
+
     # graph = StateGraph(State)
     # graph.add_node("node_default_tool_call_llm", node_default_tool_call_llm)
     # graph.add_node("tools", ToolNode(tools))
@@ -191,19 +454,16 @@ async def main():
     def build_vector_search_graph():
         graph = StateGraph(State)
         graph.add_node("node_default_tool_call_llm", node_default_tool_call_llm)
-        graph.add_node(
-            "vector_knowledge_search",
-            ToolNode([tool_map[ToolName.VECTOR_KNOWLEDGE_SEARCH.value]]),
-        )
-        graph.set_entry_point("vector_knowledge_search")
-        graph.add_edge("vector_knowledge_search", "node_default_tool_call_llm")
+        graph.add_node("node_vector_knowledge_search", node_vector_knowledge_search)
+        graph.set_entry_point("node_vector_knowledge_search")
+        graph.add_edge("node_vector_knowledge_search", "node_default_tool_call_llm")
         graph.set_finish_point("node_default_tool_call_llm")
         return graph.compile()
 
     def build_general_llm_graph():
         graph = StateGraph(State)
         graph.add_node("node_default_tool_call_llm", node_default_tool_call_llm)
-        graph.add_node("tools", ToolNode(tools))
+        graph.add_node("tools", node_tools)
         graph.add_edge(START, "node_default_tool_call_llm")
         graph.add_conditional_edges("node_default_tool_call_llm", tools_condition)
         graph.add_edge("tools", "node_default_tool_call_llm")
@@ -213,17 +473,249 @@ async def main():
     def build_other_tool_graph():
         graph = StateGraph(State)
         graph.add_node("node_default_tool_call_llm", node_default_tool_call_llm)
-        graph.add_node("tools", ToolNode(tools))
+        graph.add_node("tools", node_tools)
         graph.add_edge(START, "node_default_tool_call_llm")
         graph.add_conditional_edges("node_default_tool_call_llm", tools_condition)
         graph.add_edge("tools", "node_default_tool_call_llm")
         graph.set_finish_point("node_default_tool_call_llm")
         return graph.compile()
 
-    db_agent = build_db_search_graph()
-    vector_agent = build_vector_search_graph()
-    llm_agent = build_general_llm_graph()
-    other_tool_agent = build_other_tool_graph()
+    return {
+        "tools": tool_map,
+        "graphs": {
+            IntentLabel.DB_SEARCH.value: build_db_search_graph(),
+            IntentLabel.VECTOR_SEARCH.value: build_vector_search_graph(),
+            IntentLabel.GENERAL_LLM.value: build_general_llm_graph(),
+            IntentLabel.OTHER_TOOL.value: build_other_tool_graph(),
+        },
+    }
+
+
+async def stream_llm_response(model, messages: list):
+    """
+    Streams a model response, forwarding visible text (reasoning in <think>
+    blocks removed) to the graph's custom stream as {"token": text} while the
+    chunks, including partial tool calls, are merged into the final message.
+    """
+    from langchain_core.messages import message_chunk_to_message
+    from langgraph.config import get_stream_writer
+
+    write = get_stream_writer()
+    visible = ThinkFilter()
+    merged = None
+
+    async for chunk in model.astream(messages):
+        merged = chunk if merged is None else merged + chunk
+        if isinstance(chunk.content, str) and chunk.content:
+            text = visible.feed(chunk.content)
+            if text:
+                write({"token": text})
+
+    if text := visible.flush():
+        write({"token": text})
+    if merged is None:
+        raise RuntimeError("LLM returned an empty stream")
+    if merged.tool_calls:
+        write({"tool_calls": [call["name"] for call in merged.tool_calls]})
+    return message_chunk_to_message(merged)
+
+
+def executed_sql(args: dict) -> str:
+    """
+    The statement a query_database call runs: its query, or the one its
+    cursor continues.
+    """
+    if args.get("cursor"):
+        try:
+            return decode_cursor(args["cursor"])[0]
+        except ValueError:
+            return ""
+    return args.get("query") or ""
+
+
+async def fetch_table_info(tool_map: dict, question: str):
+    tool = tool_map[ToolName.VECTOR_TABLE_SEARCH.value]
+    return await tool.ainvoke({"query": question, "top_k": 5})
+
+
+async def fetch_knowledge(tool_map: dict, question: str):
+    tool = tool_map[ToolName.VECTOR_KNOWLEDGE_SEARCH.value]
+    return await tool.ainvoke({"query": question, "top_k": 5})
+
+
+async def fetch_schema() -> str:
+    # Cached after the first call; the thread keeps a cold reflection off the event loop.
+    from core.db_connector import get_db_schema_text
+
+    return await asyncio.to_thread(get_db_schema_text)
+
+
+def start_prefetch(tool_map: dict, question: str) -> dict:
+    """
+    Speculatively starts every retrieval step a graph might need, so they
+    overlap with classification instead of running after it.
+    """
+    tasks = {
+        "table_info": asyncio.create_task(fetch_table_info(tool_map, question)),
+        "knowledge": asyncio.create_task(fetch_knowledge(tool_map, question)),
+        "schema": asyncio.create_task(fetch_schema()),
+    }
+    for task in tasks.values():
+        # Failures of discarded speculation must not surface as "never retrieved".
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return tasks
+
+
+def answer_cache_version(intent: str):
+    """
+    Version of the data an intent's answers are derived from; cached answers
+    of an older version are not served. Vector answers follow the knowledge
+    index build, SQL answers are invalidated per table instead.
+    """
+    if intent == IntentLabel.VECTOR_SEARCH.value:
+        from core.vector_db import VECTOR_DB_ROOT
+        from core.vector_index import manifest_stamp
+
+        return manifest_stamp(VECTOR_DB_ROOT)
+    return None
+
+
+async def lookup_answer(question: str, intent: str) -> tuple[dict | None, dict | None]:
+    """
+    Returns (cached answer or None, key for storing the fresh answer). The key
+    is None when the intent is not cacheable or the cache is disabled.
+    """
+    cache = get_answer_cache()
+    if cache is None or intent not in ANSWER_CACHE_INTENTS:
+        return None, None
+
+    vector = await asyncio.to_thread(cache.embed, question)
+    version = answer_cache_version(intent)
+    cached = cache.lookup(question, intent, version=version, vector=vector)
+    return cached, {"vector": vector, "version": version}
+
+
+async def answer_question(
+    agents: dict, question: str, speculative: bool = None, trace: bool = False, on_token=None
+) -> dict:
+    """
+    Classifies a question and runs it through the matching graph. Every call
+    starts from its own message list, so concurrent calls never share state.
+    In speculative mode (SPECULATIVE_PREFETCH=true) table-description search,
+    knowledge search and schema loading start alongside classification; the
+    chosen graph consumes what it needs and the rest is cancelled.
+    While bootstrapping, a question waits only for the stages its intent
+    needs (INTENT_REQUIRES) and fails if one of them failed.
+    With `on_token`, the answer is streamed: the callback receives each piece
+    of visible answer text as the final LLM node generates it (a cached
+    answer arrives as one piece).
+    With `trace`, the timeline of classifier, node and tool spans is returned
+    under "trace"; TRACE_DIR additionally dumps every trace to a JSON file.
+    """
+    if speculative is None:
+        speculative = os.getenv("SPECULATIVE_PREFETCH", "false").lower() == "true"
+    # Speculation needs every resource; while bootstrapping, fetch only what the intent needs.
+    speculative = speculative and (readiness is None or readiness.is_ready())
+
+    with start_trace(question) as request_trace:
+        started = time.perf_counter()
+        prefetch = start_prefetch(agents["tools"], question) if speculative else {}
+
+        try:
+            classifier = await question_classifer(question) or "N/A"
+            classified = time.perf_counter()
+
+            cached, cache_key = await lookup_answer(question, classifier)
+            looked_up = time.perf_counter()
+
+            needed = set() if cached else PREFETCH_NEEDS.get(classifier, set())
+            for key, task in prefetch.items():
+                if key not in needed:
+                    task.cancel()
+
+            response = None
+            first_token = None
+            if cached:
+                answer = cached["answer"]
+                if on_token:
+                    first_token = time.perf_counter()
+                    FIRST_TOKEN_SECONDS.observe(first_token - started, intent=classifier)
+                    # Stored answers are final message contents, reasoning included.
+                    on_token(strip_think(answer))
+            else:
+                await wait_until_ready(classifier)
+                messages = [{"role": "user", "content": question}]
+                graphs = agents["graphs"]
+                agent = graphs.get(classifier, graphs[IntentLabel.GENERAL_LLM.value])
+                config = {"configurable": {"prefetch": {k: prefetch[k] for k in needed & prefetch.keys()}}}
+                if on_token:
+                    config["configurable"]["stream_tokens"] = True
+                    async for mode, chunk in agent.astream(
+                        {"messages": messages}, config=config, stream_mode=["custom", "values"]
+                    ):
+                        if mode == "values":
+                            response = chunk
+                        elif "token" in chunk:
+                            if first_token is None:
+                                first_token = time.perf_counter()
+                                FIRST_TOKEN_SECONDS.observe(first_token - started, intent=classifier)
+                            on_token(chunk["token"])
+                else:
+                    response = await agent.ainvoke({"messages": messages}, config=config)
+                last_message = response["messages"][-1]
+                answer = (
+                    last_message["content"]
+                    if isinstance(last_message, dict)
+                    else last_message.content
+                )
+            finished = time.perf_counter()
+        finally:
+            for task in prefetch.values():
+                task.cancel()
+            if os.getenv("TRACE_DIR"):
+                request_trace.dump(os.getenv("TRACE_DIR"))
+
+    QUESTION_SECONDS.observe(finished - started, intent=classifier)
+
+    live = LIVE_TOOLS.intersection(response.get("tools_used", [])) if response is not None else set()
+    if response is not None and cache_key is not None and answer and not live:
+        await asyncio.to_thread(
+            answer_cache.store,
+            question,
+            classifier,
+            answer,
+            tables=set().union(*(extract_tables(q) for q in response.get("sql_executed", []))),
+            version=cache_key["version"],
+            vector=cache_key["vector"],
+            ttl=SQL_CACHE_TTL if classifier == IntentLabel.DB_SEARCH.value else None,
+        )
+
+    result = {
+        "intent": classifier,
+        "answer": answer,
+        "timings": {
+            "classify_ms": round((classified - started) * 1000, 1),
+            "cache_ms": round((looked_up - classified) * 1000, 1),
+            "graph_ms": round((finished - looked_up) * 1000, 1),
+        },
+    }
+    if first_token is not None:
+        result["timings"]["first_token_ms"] = round((first_token - started) * 1000, 1)
+    if cached:
+        result["cached"] = {k: v for k, v in cached.items() if k != "answer"}
+    if trace:
+        result["trace"] = request_trace.to_dict()
+    return result
+
+
+STREAM_ANSWERS = os.getenv("STREAM_ANSWERS", "true").lower() == "true"
+
+
+async def main():
+    # Bootstrap stages run in threads while the MCP tools are discovered.
+    bootstrapping = asyncio.create_task(asyncio.to_thread(bootstrap))
+    agents = build_agents(await load_tools())
+    await bootstrapping
 
     print("\n##### RAG APPLICATION #####")
     print("\nEnter your question (or 'exit' to quit)")
@@ -236,34 +728,22 @@ async def main():
                 print("Exiting...")
                 break
 
-            response = None
-
-            classifier = await question_classifer(question) or "N/A"
-            print(f"\n[Classifier] Intent detected ::::: {classifier}\n")
-
-            messages = [{"role": "user", "content": question}]
-
-            if classifier == IntentLabel.DB_SEARCH.value:
-                response = await db_agent.ainvoke({"messages": messages})
-            elif classifier == IntentLabel.VECTOR_SEARCH.value:
-                response = await vector_agent.ainvoke({"messages": messages})
-            elif classifier == IntentLabel.GENERAL_LLM.value:
-                response = await llm_agent.ainvoke({"messages": messages})
-            elif classifier == IntentLabel.OTHER_TOOL.value:
-                response = await other_tool_agent.ainvoke({"messages": messages})
+            if STREAM_ANSWERS:
+                print("\n🤖 AI: ", end="", flush=True)
+                result = await answer_question(
+                    agents, question, on_token=lambda text: print(text, end="", flush=True)
+                )
+                print(f"\n\n[Classifier] Intent detected ::::: {result['intent']}")
             else:
-                response = await llm_agent.ainvoke({"messages": messages})
-
-            last_message = (
-                response["messages"][-1].content
-                if isinstance(response["messages"][-1], dict)
-                else response["messages"][-1].content
-            )
-            print("\n🤖 AI:", last_message)
+                result = await answer_question(agents, question)
+                print(f"\n[Classifier] Intent detected ::::: {result['intent']}\n")
+                print("\n🤖 AI:", result["answer"])
     except Exception as e:
         print("\n❌ Agent invocation failed: ", e)
+    finally:
+        print(f"\n🔌 MCP sessions: {tool_stats()}")
+        await close_tools()
 
 
 if __name__ == "__main__":
-    bootstrap()
     asyncio.run(main())
@@ -0,0 +1,266 @@
+import os
+import math
+import faiss
+import numpy as np
+from core.doc_store import DocStore
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# FAISS ids are (partition << PARTITION_BITS) | sequence, with one partition
+# per source file, so a source filter is a plain id range.
+PARTITION_BITS = 40
+
+
+def index_spec() -> dict:
+    """
+    Requested index settings (VECTOR_INDEX_TYPE, VECTOR_INDEX_NLIST,
+    VECTOR_INDEX_PQ_M, VECTOR_INDEX_HNSW_M, VECTOR_INDEX_TRAIN_SIZE).
+    """
+    index_type = os.getenv("VECTOR_INDEX_TYPE", "flat").strip().lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported vector index type: {index_type}")
+
+    spec = {"type": index_type}
+    if index_type.startswith("ivf"):
+        spec["nlist"] = int(os.getenv("VECTOR_INDEX_NLIST", "1024"))
+        spec["train_size"] = int(os.getenv("VECTOR_INDEX_TRAIN_SIZE", "100000"))
+    if index_type == "ivf_pq":
+        spec["pq_m"] = int(os.getenv("VECTOR_INDEX_PQ_M", "48"))
+    if index_type == "hnsw":
+        spec["hnsw_m"] = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+    return spec
+
+
+def create_index(spec: dict, train_vectors: np.ndarray) -> tuple[faiss.Index, dict]:
+    """
+    Builds (and trains) an index with caller-chosen int64 ids for the
+    requested spec, scaled down to what the training sample supports: nlist
+    is capped at n/39, IVF-PQ needs 256 training points per codebook, and
+    too-small samples fall back to flat. Returns the index and the effective
+    settings.
+    IVF indexes store the ids themselves (with a hashtable direct map for
+    reconstruct); wrapping them in IndexIDMap2 would break remove_ids, which
+    compacts the ID map assuming the inner index keeps its order.
+    """
+    n, dim = train_vectors.shape
+    index_type = spec["type"]
+    effective = {"type": index_type, "dim": dim}
+
+    if index_type.startswith("ivf"):
+        nlist = min(spec["nlist"], n // 39)
+        if nlist < 2:
+            index_type = "flat"
+        else:
+            effective["nlist"] = nlist
+        if index_type == "ivf_pq" and n < 256:
+            index_type = "ivf_flat"
+
+    if index_type == "flat":
+        base = faiss.IndexFlatL2(dim)
+        effective = {"type": "flat", "dim": dim}
+    elif index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(dim, spec["hnsw_m"])
+        effective["hnsw_m"] = spec["hnsw_m"]
+    elif index_type == "ivf_flat":
+        base = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, effective["nlist"])
+        effective["type"] = "ivf_flat"
+    else:
+        pq_m = max(m for m in range(1, min(spec["pq_m"], dim) + 1) if dim % m == 0)
+        base = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, effective["nlist"], pq_m, 8)
+        effective["pq_m"] = pq_m
+
+    if not base.is_trained:
+        base.train(train_vectors)
+
+    if effective["type"].startswith("ivf"):
+        base.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return base, effective
+    return faiss.IndexIDMap2(base), effective
+
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """
+    The index doing the search: the one behind an ID map, or the index itself.
+    """
+    return faiss.downcast_index(index.index if hasattr(index, "id_map") else index)
+
+
+def set_search_params(index: faiss.Index, nprobe: int = None, ef_search: int = None):
+    """
+    Applies query-time knobs to the index behind an ID map: nprobe for IVF,
+    efSearch for HNSW. Unused knobs are ignored.
+    """
+    base = base_index(index)
+    if nprobe and hasattr(base, "nprobe"):
+        base.nprobe = min(nprobe, base.nlist)
+    if ef_search and hasattr(base, "hnsw"):
+        base.hnsw.efSearch = ef_search
+
+
+def read_index(path: str, mmap: bool = False) -> faiss.Index:
+    """
+    Reads a FAISS index, memory-mapped when requested so that several worker
+    processes share the same page cache. Index types that cannot be mapped
+    are read into memory instead.
+    """
+    if mmap:
+        # IO_FLAG_MMAP_IFC (faiss >= 1.10) maps the codes of flat and HNSW
+        # indexes; IVF inverted lists are only mapped by IO_FLAG_MMAP alone,
+        # the IFC reader rejects them.
+        attempts = [faiss.IO_FLAG_MMAP]
+        if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+            attempts.insert(0, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_MMAP_IFC)
+        for flags in attempts:
+            try:
+                return faiss.read_index(path, flags)
+            except RuntimeError as e:
+                error = e
+        print(f"- ⚠️ Cannot mmap {path}, loading it into memory: {error}")
+    return faiss.read_index(path)
+
+
+def write_index(index: faiss.Index, path: str):
+    """
+    Writes the index to a temporary file and renames it into place, so readers
+    never see a partial file and existing mappings keep the old inode.
+    """
+    tmp_path = path + ".tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def partition_range(partition: int) -> tuple[int, int]:
+    return partition << PARTITION_BITS, (partition + 1) << PARTITION_BITS
+
+
+def filtered_search_params(
+    index: faiss.Index, partitions: list[int], expansion: float = 1.0
+) -> faiss.SearchParameters:
+    """
+    Search parameters restricting a search to the id ranges of `partitions`.
+    Only ids inside the ranges get their distance computed, so a selective
+    filter leaves fewer candidates per probed list / visited node; the
+    configured nprobe and efSearch are multiplied by `expansion` (nprobe
+    capped at nlist) to make up for it.
+    """
+    selectors = [faiss.IDSelectorRange(*partition_range(p)) for p in partitions]
+    selector = selectors[0]
+    for other in selectors[1:]:
+        selector = faiss.IDSelectorOr(selector, other)
+
+    base = base_index(index)
+    if hasattr(base, "nprobe"):
+        nprobe = min(base.nlist, math.ceil(base.nprobe * expansion))
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    elif hasattr(base, "hnsw"):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=math.ceil(base.hnsw.efSearch * expansion))
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    # The SWIG objects only hold raw pointers; keep the selectors alive.
+    params.referenced_objects = selectors
+    return params
+
+
+class IndexWriter:
+    """
+    Adds and removes chunks of an index and its DocStore, so
+    vectors keep stable int64 ids across incremental updates. Ids are never
+    reused (per-source counters are persisted in the manifest), which keeps a
+    reader on an older index from resolving a hit to a different chunk.
+    Every source file gets its own id partition (see PARTITION_BITS), which
+    is what filtered searches select on.
+    A new index buffers vectors until `train_size` are available, then is
+    created and trained from that sample.
+    """
+
+    def __init__(
+        self,
+        index: faiss.Index | None,
+        docstore: DocStore,
+        spec: dict,
+        effective: dict = None,
+        sources: dict = None,
+        next_partition: int = 0,
+    ):
+        self.index = index
+        self.docstore = docstore
+        self.spec = spec
+        self.effective = effective
+        self.sources = {name: dict(entry) for name, entry in (sources or {}).items()}
+        self.next_partition = max(
+            [next_partition] + [e["partition"] + 1 for e in self.sources.values()]
+        )
+        self._pending = []
+
+        self._ids = docstore.id_map() if index is not None else {}
+
+    def add(self, chunk_ids: list[str], documents: list, vectors: list[list[float]]):
+        if self.index is None:
+            self._pending.append((chunk_ids, documents, np.asarray(vectors, dtype=np.float32)))
+            if sum(len(p[0]) for p in self._pending) >= self.spec.get("train_size", 0):
+                self._train()
+            return
+        self._append(chunk_ids, documents, np.asarray(vectors, dtype=np.float32))
+
+    def remove(self, chunk_ids: list[str]):
+        int_ids = [self._ids.pop(c) for c in chunk_ids if c in self._ids]
+        if not int_ids or self.index is None:
+            return
+
+        if hasattr(base_index(self.index), "hnsw"):
+            # HNSW cannot delete in place: rebuild the graph from the kept vectors.
+            hnsw_m = (self.effective or self.spec).get("hnsw_m", 32)
+            kept = np.asarray(sorted(self._ids.values()), dtype=np.int64)
+            rebuilt = faiss.IndexIDMap2(faiss.IndexHNSWFlat(self.index.d, hnsw_m))
+            if len(kept):
+                rebuilt.add_with_ids(np.vstack([self.index.reconstruct(int(i)) for i in kept]), kept)
+            self.index = rebuilt
+        else:
+            self.index.remove_ids(np.asarray(int_ids, dtype=np.int64))
+
+        self.docstore.delete(int_ids)
+
+    def close(self) -> faiss.Index | None:
+        """
+        Trains a still-buffered index and refreshes the per-source chunk
+        counts; sources without chunks are dropped (their partition number
+        is not handed out again).
+        """
+        if self.index is None and self._pending:
+            self._train()
+
+        counts = self.docstore.source_counts()
+        self.sources = {
+            name: {**entry, "count": counts[name]}
+            for name, entry in self.sources.items()
+            if counts.get(name)
+        }
+        return self.index
+
+    def _train(self):
+        sample = np.vstack([p[2] for p in self._pending])
+        self.index, self.effective = create_index(self.spec, sample)
+        print(f"- 🕞 Trained {self.effective['type']} index on {len(sample)} vectors: {self.effective}")
+
+        pending, self._pending = self._pending, []
+        for chunk_ids, documents, vectors in pending:
+            self._append(chunk_ids, documents, vectors)
+
+    def _append(self, chunk_ids: list[str], documents: list, vectors: np.ndarray):
+        int_ids = np.asarray(
+            [self._allocate(doc.metadata.get("source")) for doc in documents], dtype=np.int64
+        )
+
+        self.index.add_with_ids(vectors, int_ids)
+        self.docstore.add(int_ids.tolist(), chunk_ids, documents)
+        for int_id, chunk_id in zip(int_ids.tolist(), chunk_ids):
+            self._ids[chunk_id] = int_id
+
+    def _allocate(self, source: str) -> int:
+        entry = self.sources.get(source)
+        if entry is None:
+            entry = self.sources[source] = {"partition": self.next_partition, "next_id": 0}
+            self.next_partition += 1
+        int_id = partition_range(entry["partition"])[0] | entry["next_id"]
+        entry["next_id"] += 1
+        return int_id
@@ -0,0 +1,160 @@
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from core.metrics import REGISTRY
+
+ANSWER_CACHE_LOOKUPS = REGISTRY.counter(
+    "rag_answer_cache_lookups_total", "Semantic answer cache lookups.", ("intent", "result")
+)
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by question embedding. A lookup returns the stored answer of
+    the most similar earlier question with the same intent when the cosine
+    similarity reaches `threshold`. Entries expire after `ttl` seconds, the
+    cache holds at most `max_entries` (least recently used go first), and
+    every entry remembers the tables its answer read and the index version it
+    was built from, so either changing drops it.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, ttl: float = 3600, max_entries: int = 2048):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()
+        self._matrices = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, question: str, intent: str, version=None, vector: np.ndarray = None) -> dict | None:
+        """
+        Returns {answer, question, similarity, age_s} or None.
+        """
+        vector = self.embed(question) if vector is None else vector
+        now = time.monotonic()
+
+        with self._lock:
+            keys, matrix = self._matrix(intent)
+            if not keys:
+                return self._miss(intent, "miss")
+
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return self._miss(intent, "miss")
+
+            entry = self._entries[keys[best]]
+            if now > entry["expires_at"] or (version is not None and entry["version"] != version):
+                self._remove(keys[best])
+                self.stale += 1
+                return self._miss(intent, "stale")
+
+            self._entries.move_to_end(keys[best])
+            self.hits += 1
+            ANSWER_CACHE_LOOKUPS.inc(intent=intent, result="hit")
+            return {
+                "answer": entry["answer"],
+                "question": entry["question"],
+                "similarity": round(float(similarities[best]), 4),
+                "age_s": round(now - entry["stored_at"], 1),
+            }
+
+    def store(
+        self,
+        question: str,
+        intent: str,
+        answer: str,
+        tables: set[str] = (),
+        version=None,
+        vector: np.ndarray = None,
+        ttl: float = None,
+    ):
+        """
+        `ttl` overrides the cache-wide TTL for this entry.
+        """
+        vector = self.embed(question) if vector is None else vector
+        now = time.monotonic()
+
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = {
+                "question": question,
+                "intent": intent,
+                "answer": answer,
+                "vector": vector,
+                "tables": {t.lower() for t in tables},
+                "version": version,
+                "stored_at": now,
+                "expires_at": now + (self.ttl if ttl is None else min(ttl, self.ttl)),
+            }
+            self._matrices.pop(intent, None)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, intent: str = None, table: str = None) -> int:
+        """
+        Drops the entries of an intent and/or reading a table; no arguments
+        clear the cache.
+        """
+        table = table.lower() if table else None
+        with self._lock:
+            doomed = [
+                key
+                for key, entry in self._entries.items()
+                if (intent is None or entry["intent"] == intent)
+                and (table is None or table in entry["tables"])
+            ]
+            for key in doomed:
+                self._remove(key)
+            self.invalidations += len(doomed)
+            return len(doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+            }
+
+    def _miss(self, intent: str, result: str):
+        self.misses += 1
+        ANSWER_CACHE_LOOKUPS.inc(intent=intent, result=result)
+        return None
+
+    def _matrix(self, intent: str) -> tuple[list, np.ndarray]:
+        # Stacked vectors per intent, rebuilt only after the intent's entries change.
+        if intent not in self._matrices:
+            keys = [k for k, e in self._entries.items() if e["intent"] == intent]
+            matrix = np.vstack([self._entries[k]["vector"] for k in keys]) if keys else None
+            self._matrices[intent] = (keys, matrix)
+        return self._matrices[intent]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._matrices.pop(entry["intent"], None)
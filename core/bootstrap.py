@@ -0,0 +1,113 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StageFailed(RuntimeError):
+    pass
+
+
+class Readiness:
+    """
+    State of the bootstrap stages (pending, running, ready, failed). Stages
+    run in worker threads; callers check or await the stages they depend on
+    instead of waiting for the whole bootstrap.
+    """
+
+    def __init__(self, stages: list[str]):
+        self.started_at = time.time()
+        self.stages = {
+            name: {"state": "pending", "duration_ms": None, "error": None} for name in stages
+        }
+        self._done = {name: threading.Event() for name in stages}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str, state: str, duration_s: float = None, error: str = None):
+        with self._lock:
+            stage = self.stages[name]
+            stage["state"] = state
+            if duration_s is not None:
+                stage["duration_ms"] = round(duration_s * 1000, 1)
+            stage["error"] = error
+        if state in ("ready", "failed"):
+            self._done[name].set()
+
+    def is_ready(self, names=None) -> bool:
+        names = self.stages if names is None else names
+        return all(self.stages[n]["state"] == "ready" for n in names)
+
+    def is_done(self, names=None) -> bool:
+        names = self.stages if names is None else names
+        return all(self._done[n].is_set() for n in names)
+
+    def failures(self, names=None) -> dict:
+        names = self.stages if names is None else names
+        return {n: self.stages[n]["error"] for n in names if self.stages[n]["state"] == "failed"}
+
+    def wait_all(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._done.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                return False
+        return True
+
+    async def wait(self, names, timeout: float = None, poll_interval: float = 0.05):
+        """
+        Waits until the named stages are done without blocking the event loop.
+        Raises StageFailed if one of them failed, TimeoutError after `timeout`.
+        """
+        names = [n for n in names if n in self.stages]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_done(names):
+            if deadline is not None and time.monotonic() > deadline:
+                pending = [n for n in names if not self._done[n].is_set()]
+                raise TimeoutError(f"Bootstrap stages not ready: {', '.join(pending)}")
+            await asyncio.sleep(poll_interval)
+
+        failed = self.failures(names)
+        if failed:
+            raise StageFailed(
+                "Bootstrap failed: " + "; ".join(f"{n}: {e}" for n, e in failed.items())
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.is_ready(),
+                "started_at": self.started_at,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            }
+
+
+def run_stages(stages: dict, readiness: Readiness = None) -> Readiness:
+    """
+    Starts every stage of {name: (fn, [dependencies])} in its own thread and
+    returns immediately. A stage runs once its dependencies are ready and is
+    marked failed, without running, when one of them failed.
+    """
+    readiness = readiness or Readiness(list(stages))
+    executor = ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="bootstrap")
+
+    def run(name, fn, dependencies):
+        for dependency in dependencies:
+            readiness._done[dependency].wait()
+        failed = readiness.failures(dependencies)
+        if failed:
+            readiness.mark(name, "failed", error=f"dependency failed: {', '.join(failed)}")
+            return
+
+        readiness.mark(name, "running")
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            readiness.mark(name, "failed", time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        else:
+            readiness.mark(name, "ready", time.perf_counter() - started)
+
+    for name, (fn, dependencies) in stages.items():
+        executor.submit(run, name, fn, dependencies)
+    executor.shutdown(wait=False)
+    return readiness
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
+import time
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,33 +14,90 @@ load_dotenv()
 _engine = None
 _session = None
 
+_async_engine = None
+_async_session = None
+_async_pool_capacity = None
 
-def init_db_engine(pool_size=5, max_overflow=10):
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_database_url(async_driver: bool = False) -> str:
+    """
+    DB_URL overrides the MySQL settings (e.g. sqlite:///classicmodels.sqlite for
+    local runs). With async_driver=True the matching async driver is selected.
+    """
+    connection_url = os.getenv("DB_URL", "").strip()
+
+    if not connection_url:
+        user = os.getenv("DB_USER", "").strip()
+        password = os.getenv("DB_PASSWORD", "").strip()
+        host = os.getenv("DB_HOST", "").strip()
+        port = os.getenv("DB_PORT", "3306").strip()
+        db_name = os.getenv("DB_NAME", "").strip()
+
+        connection_url = (
+            f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}"
+        )
+
+    if async_driver:
+        url = make_url(connection_url)
+        backend = url.get_backend_name()
+        if backend not in ASYNC_DRIVERS:
+            raise ValueError(f"No async driver configured for: {backend}")
+        connection_url = url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+            hide_password=False
+        )
+
+    return connection_url
+
+
+def _engine_options(connection_url, pool_size, max_overflow, statement_timeout_ms) -> dict:
+    options = {"pool_recycle": 1800, "echo": False}
+
+    if make_url(connection_url).get_backend_name() == "mysql":
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=30)
+        if statement_timeout_ms and make_url(connection_url).get_driver_name() == "pymysql":
+            # Client-side backstop in case the server ignores max_execution_time.
+            options["connect_args"] = {"read_timeout": max(1, statement_timeout_ms // 1000 + 5)}
+    return options
+
+
+def _install_statement_timeout(engine, statement_timeout_ms):
+    if not statement_timeout_ms or engine.dialect.name != "mysql":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET SESSION max_execution_time = {int(statement_timeout_ms)}")
+        cursor.close()
+
+
+def init_db_engine(pool_size=5, max_overflow=10, statement_timeout_ms=None):
+    """
+    Creates the pooled engine. Every pooled MySQL connection gets
+    max_execution_time set, so a runaway SELECT is aborted server-side after
+    `statement_timeout_ms` (default DB_STATEMENT_TIMEOUT_MS, 30000; 0 disables).
+    """
     global _engine, _session
 
     if _engine is None:
         try:
             print("- 🕞 Creating SQLAlchemy DB engine...")
-            
-            user = os.getenv("DB_USER", "").strip()
-            password = os.getenv("DB_PASSWORD", "").strip()
-            host = os.getenv("DB_HOST", "").strip()
-            port = os.getenv("DB_PORT", "3306").strip()
-            db_name = os.getenv("DB_NAME", "").strip()
-
-            connection_url = (
-                f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}"
-            )
 
+            if statement_timeout_ms is None:
+                statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+            connection_url = get_database_url()
             _engine = create_engine(
                 connection_url,
-                pool_size=pool_size,
-                max_overflow=max_overflow,
-                pool_recycle=1800,
-                pool_timeout=30,
-                echo=False,
                 future=True,
+                **_engine_options(connection_url, pool_size, max_overflow, statement_timeout_ms),
             )
+            _install_statement_timeout(_engine, statement_timeout_ms)
 
             _session = scoped_session(
                 sessionmaker(bind=_engine, autoflush=False, autocommit=False)
@@ -48,38 +109,212 @@ def init_db_engine(pool_size=5, max_overflow=10):
             raise
 
 
+def init_async_db_engine(pool_size=5, max_overflow=10, statement_timeout_ms=None):
+    """
+    Async counterpart of init_db_engine (aiomysql for MySQL, aiosqlite for a
+    local SQLite stand-in), with the same pool and statement-timeout settings.
+    """
+    global _async_engine, _async_session, _async_pool_capacity
+
+    if _async_engine is None:
+        try:
+            print("- 🕞 Creating async SQLAlchemy DB engine...")
+
+            if statement_timeout_ms is None:
+                statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+            connection_url = get_database_url(async_driver=True)
+            _async_engine = create_async_engine(
+                connection_url,
+                **_engine_options(connection_url, pool_size, max_overflow, statement_timeout_ms),
+            )
+            _install_statement_timeout(_async_engine.sync_engine, statement_timeout_ms)
+
+            _async_session = async_sessionmaker(
+                bind=_async_engine, autoflush=False, expire_on_commit=False
+            )
+            _async_pool_capacity = pool_size + max(max_overflow, 0)
+            print("- ✅ Async SQLAlchemy engine initialized successfully.")
+
+        except SQLAlchemyError as e:
+            print("- ❌ Async SQLAlchemy initialization failed:", e)
+            raise
+
+
+async def dispose_async_db_engine():
+    """
+    Closes the async pool. aiosqlite runs each connection on a non-daemon
+    thread, so a process that used the engine does not exit until it is
+    disposed.
+    """
+    global _async_engine, _async_session, _async_pool_capacity
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session = None
+        _async_pool_capacity = None
+
+
+def get_async_session() -> AsyncSession:
+    if _async_engine is None or _async_session is None:
+        init_async_db_engine()
+    return _async_session()
+
+
+def get_async_pool_capacity() -> int:
+    """
+    Maximum number of connections the async pool hands out at once.
+    """
+    if _async_engine is None:
+        init_async_db_engine()
+    return _async_pool_capacity
+
+
 def get_session():
     if _engine is None or _session is None:
         init_db_engine()
     return _session()
 
-def get_db_schema():
+SCHEMA_QUERY = """
+SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_DEFAULT,
+       c.COLUMN_KEY, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME
+FROM information_schema.COLUMNS c
+JOIN information_schema.TABLES t
+  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+LEFT JOIN information_schema.KEY_COLUMN_USAGE k
+  ON k.TABLE_SCHEMA = c.TABLE_SCHEMA AND k.TABLE_NAME = c.TABLE_NAME
+ AND k.COLUMN_NAME = c.COLUMN_NAME AND k.REFERENCED_TABLE_NAME IS NOT NULL
+WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+_schema_cache = {"schema": None, "text": None, "loaded_at": 0.0}
+_schema_lock = threading.Lock()
+
+
+def get_db_schema(refresh: bool = False) -> dict:
+    """
+    Returns {table: [column info]} for the connected database. The result is
+    cached for SCHEMA_CACHE_TTL seconds (default 300); pass refresh=True or
+    call invalidate_db_schema() after DDL changes.
+    """
+    ttl = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+
+    with _schema_lock:
+        fresh = time.monotonic() - _schema_cache["loaded_at"] < ttl
+        if _schema_cache["schema"] is not None and fresh and not refresh:
+            return _schema_cache["schema"]
+
+        schema = _reflect_schema()
+        _schema_cache["schema"] = schema
+        _schema_cache["text"] = render_schema_text(schema)
+        _schema_cache["loaded_at"] = time.monotonic()
+        return schema
+
+
+def get_db_schema_text(refresh: bool = False) -> str:
+    """
+    Returns the cached, prompt-ready rendering of the schema, one line per table:
+    customers(customerNumber int PK, salesRepEmployeeNumber int FK->employees.employeeNumber, ...)
+    """
+    get_db_schema(refresh=refresh)
+    return _schema_cache["text"]
+
+
+def invalidate_db_schema():
+    with _schema_lock:
+        _schema_cache["schema"] = None
+        _schema_cache["text"] = None
+        _schema_cache["loaded_at"] = 0.0
+
+
+def render_schema_text(schema: dict) -> str:
+    lines = []
+    for table_name, columns in schema.items():
+        parts = []
+        for col in columns:
+            part = f"{col['name']} {col['type']}"
+            if col["primary_key"]:
+                part += " PK"
+            if col.get("foreign_key"):
+                part += f" FK->{col['foreign_key']}"
+            if not col["nullable"]:
+                part += " NOT NULL"
+            parts.append(part)
+        lines.append(f"{table_name}({', '.join(parts)})")
+    return "\n".join(lines)
+
+
+def _reflect_schema() -> dict:
     if _engine is None:
         init_db_engine()
 
     try:
         print("- 🕞 Getting DB Schema...")
 
-        inspector = inspect(_engine)
-        schema = {}
+        if _engine.dialect.name == "mysql":
+            schema = _reflect_schema_bulk()
+        else:
+            schema = _reflect_schema_inspector()
 
-        for table_name in inspector.get_table_names():
-            columns = inspector.get_columns(table_name)
-            schema[table_name] = []
-            for col in columns:
-                col_info = {
+        print(f"- ✅ DB Schema Extracted successfully ({len(schema)} tables).")
+        return schema
+
+    except SQLAlchemyError as e:
+        print("- ❌ DB Schema extraction failed:", e)
+        raise
+
+
+def _reflect_schema_bulk() -> dict:
+    """
+    Reflects every column with its primary/foreign key info in a single
+    information_schema round-trip.
+    """
+    schema = {}
+    with _engine.connect() as connection:
+        for row in connection.execute(text(SCHEMA_QUERY)):
+            table_name, column_name, column_type, is_nullable, default, key, ref_table, ref_column = row
+            columns = schema.setdefault(table_name, [])
+            if columns and columns[-1]["name"] == column_name:
+                # Column referencing several tables; keep the first reference.
+                continue
+            columns.append(
+                {
+                    "name": column_name,
+                    "type": column_type,
+                    "nullable": is_nullable == "YES",
+                    "default": default,
+                    "primary_key": key == "PRI",
+                    "foreign_key": f"{ref_table}.{ref_column}" if ref_table else None,
+                }
+            )
+    return schema
+
+
+def _reflect_schema_inspector() -> dict:
+    inspector = inspect(_engine)
+    schema = {}
+
+    for table_name in inspector.get_table_names():
+        primary_keys = set(
+            inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+        )
+        foreign_keys = {}
+        for fk in inspector.get_foreign_keys(table_name):
+            for column, referred in zip(fk["constrained_columns"], fk["referred_columns"]):
+                foreign_keys.setdefault(column, f"{fk['referred_table']}.{referred}")
+
+        schema[table_name] = []
+        for col in inspector.get_columns(table_name):
+            schema[table_name].append(
+                {
                     "name": col["name"],
                     "type": str(col["type"]),
                     "nullable": col.get("nullable", True),
                     "default": col.get("default", None),
-                    "primary_key": col.get("primary_key", False),
+                    "primary_key": col["name"] in primary_keys,
+                    "foreign_key": foreign_keys.get(col["name"]),
                 }
-                schema[table_name].append(col_info)
-        print("- ✅ DB Schema Extracted successfully.")
-        return schema
-
-    except SQLAlchemyError as e:
-            print("- ❌ DB Schema extraction failed:", e)
-            raise
-
-    
\ No newline at end of file
+            )
+    return schema
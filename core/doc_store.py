@@ -0,0 +1,91 @@
+import os
+import json
+import sqlite3
+from langchain_core.documents import Document
+
+DOC_STORE_FILE = "docs.sqlite"
+
+
+class DocStore:
+    """
+    Chunk text and metadata keyed by the int64 FAISS id, stored in SQLite
+    instead of a pickled docstore. Readers fetch only the rows of the top-k
+    hits, so the text never has to be held in memory. Writes are buffered in
+    one transaction until `commit()`, so readers see either the old or the new
+    set of chunks.
+    """
+
+    @classmethod
+    def copy_of(cls, source_path: str, path: str) -> "DocStore":
+        """
+        A writable copy of another doc store, for staging incremental changes
+        while readers keep using the original.
+        """
+        source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        return cls(path)
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+
+        if readonly:
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE, source TEXT, "
+            "content TEXT, metadata TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks(source)")
+        self._db.commit()
+
+    def add(self, ids: list[int], chunk_ids: list[str], documents: list[Document]):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO chunks (id, chunk_id, source, content, metadata) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (int_id, chunk_id, doc.metadata.get("source"), doc.page_content, json.dumps(doc.metadata))
+                for int_id, chunk_id, doc in zip(ids, chunk_ids, documents)
+            ],
+        )
+
+    def delete(self, ids: list[int]):
+        self._db.executemany("DELETE FROM chunks WHERE id = ?", [(int_id,) for int_id in ids])
+
+    def get(self, ids: list[int]) -> dict[int, Document]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        rows = self._db.execute(
+            f"SELECT id, content, metadata FROM chunks WHERE id IN ({placeholders})",
+            [int(i) for i in ids],
+        )
+        return {
+            int_id: Document(page_content=content, metadata=json.loads(metadata))
+            for int_id, content, metadata in rows
+        }
+
+    def id_map(self) -> dict[str, int]:
+        """
+        chunk id -> FAISS id, for incremental updates.
+        """
+        return dict(self._db.execute("SELECT chunk_id, id FROM chunks"))
+
+    def source_counts(self) -> dict[str, int]:
+        return dict(self._db.execute("SELECT source, COUNT(*) FROM chunks GROUP BY source"))
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
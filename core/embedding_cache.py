@@ -0,0 +1,240 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in wrapper around any embeddings object that caches vectors on disk
+    (SQLite) with an in-memory LRU in front. Entries are keyed by
+    (model, input kind, normalized text hash), since providers such as Cohere
+    embed queries and documents differently.
+
+    Disk hits only note their access time in memory; the times are written
+    with the next store, or every `touch_interval` seconds, so reads never
+    commit on their own. The row count is tracked as rows are added and only
+    re-counted when it says the table is over `max_disk_entries`; eviction
+    then goes down to 90% so the next check is far away.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str = None,
+        cache_path: str = "vector_db/embedding_cache.sqlite",
+        memory_size: int = 4096,
+        max_disk_entries: int = 500_000,
+        touch_interval: float = 60.0,
+    ):
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.cache_path = cache_path
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.touch_interval = touch_interval
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._touched_since = time.monotonic()
+
+        if os.path.dirname(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT, vector BLOB, last_used REAL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)"
+        )
+        self._db.commit()
+        (self._disk_entries,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key("document", t) for t in texts]
+        vectors, missing = self._lookup(keys)
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[p[0]] for p in missing.values()])
+            self._store(vectors, missing, fresh)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key("query", text)
+        vectors, missing = self._lookup([key])
+        if missing:
+            self._store(vectors, missing, [self.embeddings.embed_query(text)])
+        return vectors[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds several queries with one provider call for all cache misses.
+        """
+        keys = [self._key("query", t) for t in texts]
+        vectors, missing = self._lookup(keys)
+        if missing:
+            fresh = embed_queries(self.embeddings, [texts[p[0]] for p in missing.values()])
+            self._store(vectors, missing, fresh)
+        return vectors
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key("document", t) for t in texts]
+        vectors, missing = self._lookup(keys)
+        if missing:
+            fresh = await self.embeddings.aembed_documents(
+                [texts[p[0]] for p in missing.values()]
+            )
+            self._store(vectors, missing, fresh)
+        return vectors
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key("query", text)
+        vectors, missing = self._lookup([key])
+        if missing:
+            fresh = [await self.embeddings.aembed_query(text)]
+            self._store(vectors, missing, fresh)
+        return vectors[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _key(self, kind: str, text: str) -> str:
+        normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+        payload = f"{self.model}\0{kind}\0{normalized}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: list[str]):
+        vectors = [None] * len(keys)
+        pending = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[i] = self._memory[key]
+                    self.hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending:
+                found = self._read_disk(list(pending))
+                for key, vector in found.items():
+                    for i in pending.pop(key):
+                        vectors[i] = vector
+                        self.hits += 1
+                        self.disk_hits += 1
+                    self._remember(key, vector)
+
+            self.misses += sum(len(positions) for positions in pending.values())
+
+        # Remaining keys map to every position they occur at, so duplicate
+        # texts in one call are only sent to the provider once.
+        return vectors, pending
+
+    def _store(self, vectors: list, missing: dict, fresh: list):
+        rows = []
+        now = time.time()
+        with self._lock:
+            for (key, positions), vector in zip(missing.items(), fresh):
+                vector = list(vector)
+                for i in positions:
+                    vectors[i] = vector
+                self._remember(key, vector)
+                rows.append((key, self.model, array("f", vector).tobytes(), now))
+
+            self._write_touches()
+            # A key stored meanwhile (another thread or process) keeps its row.
+            inserted = self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?)", rows
+            ).rowcount
+            self._disk_entries += max(inserted, 0)
+            self._evict_disk()
+            self._db.commit()
+
+    def _read_disk(self, keys: list[str]) -> dict:
+        found = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for key, blob in self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch,
+            ):
+                found[key] = array("f", blob).tolist()
+
+        if found:
+            now = time.time()
+            self._touched.update(dict.fromkeys(found, now))
+            if len(self._touched) >= 1000 or time.monotonic() - self._touched_since >= self.touch_interval:
+                self._write_touches()
+                self._db.commit()
+        return found
+
+    def _write_touches(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touched_since = time.monotonic()
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        if self._disk_entries <= self.max_disk_entries:
+            return
+        # Other processes may share the file, so the estimate is confirmed first.
+        (self._disk_entries,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if self._disk_entries <= self.max_disk_entries:
+            return
+        overflow = self._disk_entries - int(self.max_disk_entries * 0.9)
+        deleted = self._db.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        ).rowcount
+        self._disk_entries -= deleted
+        self.evictions += deleted
+
+
+def embed_queries(embeddings, texts: list[str]) -> list[list[float]]:
+    """
+    Batch query embedding for any embeddings object: uses a native batch
+    method when there is one (Cohere's embed with input_type="search_query"),
+    otherwise embeds the queries one by one.
+    """
+    if not texts:
+        return []
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(texts)
+    if type(embeddings).__name__ == "CohereEmbeddings":
+        return embeddings.embed(texts, input_type="search_query")
+    return [embeddings.embed_query(text) for text in texts]
@@ -0,0 +1,93 @@
+import time
+import random
+import asyncio
+from itertools import islice
+from typing import Iterable
+from langchain_core.documents import Document
+from core.ann_index import IndexWriter
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status == 429:
+        return True
+    name = type(error).__name__.lower()
+    message = str(error).lower()
+    return (
+        "ratelimit" in name
+        or "toomanyrequests" in name
+        or "rate limit" in message
+        or "too many requests" in message
+    )
+
+
+async def aembed_batch(embeddings, texts: list[str], max_retries: int = 5, base_delay: float = 1.0):
+    """
+    Embeds one batch, backing off exponentially (with jitter) on rate-limit errors.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await embeddings.aembed_documents(texts)
+        except Exception as e:
+            if attempt >= max_retries or not is_rate_limit_error(e):
+                raise
+            delay = base_delay * (2**attempt) * (1 + random.random())
+            attempt += 1
+            print(f"- ⚠️ Embedding rate limited, retry {attempt}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def aembed_into_index(
+    writer: IndexWriter,
+    chunks: Iterable[tuple[str, Document]],
+    embeddings,
+    batch_size: int = 96,
+    max_in_flight: int = 4,
+    max_retries: int = 5,
+):
+    """
+    Embeds (id, Document) chunks in fixed-size batches with up to `max_in_flight`
+    concurrent requests and hands each batch to the index writer as soon as it
+    completes. Chunks are pulled lazily, so at most `max_in_flight` batches are
+    held in memory.
+    """
+    done = 0
+    started = time.perf_counter()
+    in_flight = set()
+    chunks = iter(chunks)
+
+    async def run(batch):
+        vectors = await aembed_batch(
+            embeddings, [doc.page_content for _, doc in batch], max_retries=max_retries
+        )
+        return batch, vectors
+
+    def append(batch, vectors):
+        nonlocal done
+        writer.add([chunk_id for chunk_id, _ in batch], [doc for _, doc in batch], vectors)
+
+        done += len(batch)
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"- 🕞 Embedded {done} chunks ({rate:.1f} chunks/s)")
+
+    async def drain():
+        nonlocal in_flight
+        finished, in_flight = await asyncio.wait(
+            in_flight, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in finished:
+            append(*task.result())
+
+    try:
+        while batch := list(islice(chunks, batch_size)):
+            if len(in_flight) >= max_in_flight:
+                await drain()
+            in_flight.add(asyncio.create_task(run(batch)))
+
+        while in_flight:
+            await drain()
+    except BaseException:
+        for task in in_flight:
+            task.cancel()
+        raise
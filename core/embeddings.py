@@ -0,0 +1,163 @@
+import os
+import re
+import math
+import asyncio
+import hashlib
+import threading
+from langchain_core.embeddings import Embeddings
+from core.embedding_cache import CachedEmbeddings
+
+DEFAULT_MODELS = {
+    "cohere": "embed-english-light-v3.0",
+    "sentence_transformers": "sentence-transformers/all-MiniLM-L6-v2",
+    "hashing": "hashing-384",
+}
+
+# Kept for callers that only care about the default remote model.
+EMBEDDING_MODEL = DEFAULT_MODELS["cohere"]
+
+_embeddings = {}
+_embeddings_lock = threading.Lock()
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic, dependency-free embedder based on signed feature hashing of
+    word unigrams/bigrams and character trigrams. Runs fully offline in
+    microseconds; meant for tests, benchmarks and air-gapped setups.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.embed_query(text)
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dim
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """
+    Local CPU embedder backed by a sentence-transformers model. The library is
+    imported lazily so it is only required when this backend is selected.
+    """
+
+    def __init__(self, model: str, device: str = "cpu"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = model
+        self._model = SentenceTransformer(model, device=device)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await asyncio.to_thread(self.embed_query, text)
+
+
+def embedding_spec(backend: str = None, model: str = None) -> dict:
+    """
+    Resolves the configured backend/model (EMBEDDING_BACKEND, EMBEDDING_MODEL).
+    The result is recorded in the index manifest.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND") or "cohere").strip().lower()
+    if backend not in DEFAULT_MODELS:
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+    model = model or os.getenv("EMBEDDING_MODEL") or DEFAULT_MODELS[backend]
+    return {"backend": backend, "model": model.strip()}
+
+
+def get_embeddings(cohere_api_key: str = None, backend: str = None, model: str = None) -> Embeddings:
+    """
+    Returns the shared embeddings for the configured backend, used both for
+    index building and query-time search. Remote backends are wrapped in the
+    persistent embedding cache so a chunk or question is only embedded once.
+    """
+    spec = embedding_spec(backend, model)
+    cache_path = os.getenv("EMBEDDING_CACHE_PATH", "vector_db/embedding_cache.sqlite")
+    key = (spec["backend"], spec["model"], cache_path)
+
+    with _embeddings_lock:
+        # Concurrent bootstrap stages share one instance (and its cache connection).
+        if key in _embeddings:
+            return _embeddings[key]
+
+        if spec["backend"] == "hashing":
+            match = re.fullmatch(r"hashing-(\d+)", spec["model"])
+            if not match:
+                raise ValueError(f"Hashing model must look like 'hashing-<dim>': {spec['model']}")
+            embeddings = HashingEmbeddings(dim=int(match.group(1)))
+        else:
+            if spec["backend"] == "cohere":
+                from langchain_cohere import CohereEmbeddings
+
+                base = CohereEmbeddings(cohere_api_key=cohere_api_key, model=spec["model"])
+            else:
+                base = SentenceTransformerEmbeddings(spec["model"])
+
+            embeddings = CachedEmbeddings(
+                base,
+                model=f"{spec['backend']}:{spec['model']}",
+                cache_path=cache_path,
+                memory_size=int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "4096")),
+                max_disk_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000")),
+            )
+
+        _embeddings[key] = embeddings
+        return embeddings
+
+
+def get_index_embeddings(manifest: dict, cohere_api_key: str = None) -> Embeddings:
+    """
+    Returns embeddings matching the backend/model an index was built with.
+    Raises if the configured backend disagrees with the index manifest, so the
+    query side can never silently embed into a different vector space.
+    """
+    built_with = manifest.get("settings", {}).get("embedding")
+    if not built_with:
+        return get_embeddings(cohere_api_key)
+
+    configured = embedding_spec()
+    explicitly_configured = os.getenv("EMBEDDING_BACKEND") or os.getenv("EMBEDDING_MODEL")
+    if explicitly_configured and configured != built_with:
+        raise RuntimeError(
+            f"Embedding backend mismatch: index built with {built_with}, "
+            f"configured {configured}. Rebuild the index or fix EMBEDDING_BACKEND/EMBEDDING_MODEL."
+        )
+    return get_embeddings(cohere_api_key, **built_with)
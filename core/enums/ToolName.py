@@ -9,3 +9,5 @@ class ToolName(Enum):
     QUERY_DATABASE = "query_database"
     VECTOR_KNOWLEDGE_SEARCH = "vector_knowledge_search"
     VECTOR_TABLE_SEARCH = "vector_table_search"
+    VECTOR_BATCH_SEARCH = "vector_batch_search"
+    VECTOR_LIST_SOURCES = "vector_list_sources"
@@ -0,0 +1,91 @@
+import re
+import yaml
+import threading
+from collections import OrderedDict
+from core.embeddings import HashingEmbeddings
+
+
+class LocalIntentClassifier:
+    """
+    Nearest-prototype intent classifier trained from labelled example questions.
+    Questions are embedded locally with the hashing embedder and scored against
+    every example and every label centroid; a prediction is only returned when
+    both the best score and its margin over the runner-up label are high enough,
+    otherwise the caller falls back to the LLM.
+    """
+
+    def __init__(self, examples: dict[str, list[str]], min_score: float = 0.25, min_margin: float = 0.1):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.embeddings = HashingEmbeddings(dim=1024)
+        self.prototypes = {}
+        self.centroids = {}
+
+        for label, questions in examples.items():
+            vectors = self.embeddings.embed_documents(questions)
+            self.prototypes[label] = vectors
+            centroid = [sum(values) / len(vectors) for values in zip(*vectors)]
+            norm = sum(v * v for v in centroid) ** 0.5 or 1.0
+            self.centroids[label] = [v / norm for v in centroid]
+
+    @classmethod
+    def from_yaml(cls, path: str, **kwargs) -> "LocalIntentClassifier":
+        with open(path, "r") as f:
+            return cls(yaml.safe_load(f), **kwargs)
+
+    def scores(self, question: str) -> dict[str, float]:
+        vector = self.embeddings.embed_query(question)
+        scores = {}
+        for label, prototypes in self.prototypes.items():
+            nearest = max(_dot(vector, p) for p in prototypes)
+            scores[label] = 0.5 * nearest + 0.5 * _dot(vector, self.centroids[label])
+        return scores
+
+    def predict(self, question: str) -> tuple[str | None, float]:
+        """
+        Returns (label, score), with label None when not confident.
+        """
+        ranked = sorted(self.scores(question).items(), key=lambda kv: kv[1], reverse=True)
+        (label, best), (_, second) = ranked[0], ranked[1] if len(ranked) > 1 else (None, 0.0)
+        if best >= self.min_score and best - second >= self.min_margin:
+            return label, best
+        return None, best
+
+
+class ClassificationCache:
+    """
+    Small LRU of recent question -> intent results.
+    """
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return re.sub(r"\s+", " ", question.strip().lower())
+
+    def get(self, question: str) -> str | None:
+        key = self.normalize(question)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, question: str, label: str):
+        key = self.normalize(question)
+        with self._lock:
+            self._entries[key] = label
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
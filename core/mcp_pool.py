@@ -0,0 +1,285 @@
+import json
+import time
+import asyncio
+from itertools import cycle
+from contextlib import asynccontextmanager
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from core.metrics import REGISTRY, SIZE_BUCKETS, timed
+
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "rag_tool_call_duration_seconds", "MCP tool call round trip seen by the client.", ("server", "tool")
+)
+TOOL_CALL_ERRORS = REGISTRY.counter(
+    "rag_tool_call_errors_total", "MCP tool calls that raised.", ("server", "tool")
+)
+TOOL_PAYLOAD_BYTES = REGISTRY.histogram(
+    "rag_tool_payload_bytes",
+    "Size of MCP tool arguments and results.",
+    ("server", "tool", "direction"),
+    buckets=SIZE_BUCKETS,
+)
+
+
+@asynccontextmanager
+async def open_session(connection: dict):
+    """
+    Opens an initialized MCP session for a tool-registry connection. Besides
+    the transports of langchain-mcp-adapters, {"transport": "in_memory",
+    "server": <FastMCP>} connects to a server object in this process.
+    """
+    if connection.get("transport") == "in_memory":
+        from fastmcp import Client
+
+        async with Client(connection["server"]) as client:
+            yield client.session
+        return
+
+    async with create_session(connection) as session:
+        await session.initialize()
+        yield session
+
+
+class PooledSession:
+    """
+    One long-lived MCP session to a server. The session is opened and closed
+    inside its own task (the MCP transports require that), and callers get
+    the live session back on every call instead of a fresh connection.
+    A dead session is reopened on the next call; calls that fail at the
+    transport level are retried once on a new session. Tool errors (McpError)
+    are not retried.
+    """
+
+    def __init__(self, server: str, connection: dict, connect_timeout: float = 30.0):
+        self.server = server
+        self.connection = connection
+        self.connect_timeout = connect_timeout
+
+        self.calls = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.last_error = None
+
+        self._session = None
+        self._task = None
+        self._stop = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None and not self._task.done()
+
+    async def session(self) -> ClientSession:
+        if self.connected:
+            return self._session
+
+        async with self._lock:
+            if not self.connected:
+                if self._session is not None:
+                    self.reconnects += 1
+                await self.close()
+                await self._connect()
+        return self._session
+
+    async def call_tool(self, name: str, arguments: dict):
+        session = await self.session()
+        try:
+            result = await session.call_tool(name, arguments)
+        except McpError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            await self._discard(session)
+            result = await (await self.session()).call_tool(name, arguments)
+        self.calls += 1
+        return result
+
+    async def list_tools(self) -> list:
+        session = await self.session()
+        tools, cursor = [], None
+        while True:
+            page = await session.list_tools(cursor=cursor) if cursor else await session.list_tools()
+            tools.extend(page.tools)
+            cursor = page.nextCursor
+            if not cursor:
+                return tools
+
+    async def ping(self) -> bool:
+        """
+        Health check; a failed ping drops the session so it is reopened.
+        """
+        session = self._session
+        if session is None or not self.connected:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=self.connect_timeout)
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            await self._discard(session)
+            return False
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.connect_timeout)
+        except Exception:
+            self._task.cancel()
+        self._session = self._task = self._stop = None
+
+    async def _discard(self, session: ClientSession):
+        async with self._lock:
+            if self._session is session:
+                await self.close()
+
+    async def _connect(self):
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def hold():
+            try:
+                async with open_session(self.connection) as session:
+                    ready.set_result(session)
+                    await stop.wait()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                else:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if not isinstance(e, Exception):
+                    raise
+
+        task = asyncio.create_task(hold(), name=f"mcp:{self.server}")
+        try:
+            self._session = await asyncio.wait_for(asyncio.shield(ready), timeout=self.connect_timeout)
+        except BaseException:
+            stop.set()
+            task.cancel()
+            raise
+        self._task, self._stop = task, stop
+        self.connects += 1
+
+
+class _ServerSessions:
+    """
+    Round-robins tool calls over the pooled sessions of one server and records
+    client-side call latency and payload sizes. This is what the LangChain
+    tools hold as their "session".
+    """
+
+    def __init__(self, sessions: list[PooledSession]):
+        self.sessions = sessions
+        self._next = cycle(sessions)
+
+    async def call_tool(self, name: str, arguments: dict):
+        server = self.sessions[0].server
+        TOOL_PAYLOAD_BYTES.observe(
+            len(json.dumps(arguments, default=str)), server=server, tool=name, direction="request"
+        )
+        try:
+            with timed(TOOL_CALL_SECONDS, f"tool:{name}", server=server, tool=name):
+                result = await next(self._next).call_tool(name, arguments)
+        except Exception:
+            TOOL_CALL_ERRORS.inc(server=server, tool=name)
+            raise
+
+        size = sum(len(getattr(item, "text", "") or "") for item in result.content)
+        TOOL_PAYLOAD_BYTES.observe(size, server=server, tool=name, direction="response")
+        return result
+
+
+class MCPSessionPool:
+    """
+    Long-lived, health-checked MCP sessions for every server of the tool
+    registry, shared by all tool calls and concurrent requests. The tools
+    returned by `get_tools()` are bound to the pool instead of opening a new
+    session (or stdio subprocess) per call.
+    """
+
+    def __init__(
+        self,
+        connections: dict,
+        sessions_per_server: int = 1,
+        health_interval: float = 30.0,
+        connect_timeout: float = 30.0,
+    ):
+        self.connections = connections
+        self.health_interval = health_interval
+        self.servers = {
+            server: [
+                PooledSession(server, connection, connect_timeout)
+                for _ in range(sessions_per_server)
+            ]
+            for server, connection in connections.items()
+        }
+        self.started_at = None
+        self._health_task = None
+
+    async def get_tools(self) -> list:
+        """
+        Connects to every server and returns its tools bound to the pool.
+        Servers that cannot be reached are reported and skipped.
+        """
+        tools = []
+        for server, sessions in self.servers.items():
+            try:
+                listed = await sessions[0].list_tools()
+                await asyncio.gather(*(s.session() for s in sessions[1:]))
+            except Exception as e:
+                print(f"- ⚠️ MCP server {server} unavailable: {e}")
+                continue
+            proxy = _ServerSessions(sessions)
+            tools.extend(convert_mcp_tool_to_langchain_tool(proxy, tool) for tool in listed)
+
+        self.started_at = time.time()
+        if self._health_task is None and self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp:health")
+        return tools
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for sessions in self.servers.values():
+                for session in sessions:
+                    if session.connected:
+                        await session.ping()
+                    else:
+                        try:
+                            await session.session()
+                        except Exception as e:
+                            session.last_error = f"{type(e).__name__}: {e}"
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        for sessions in self.servers.values():
+            for session in sessions:
+                await session.close()
+
+    def stats(self) -> dict:
+        """
+        Per-server connection reuse: `calls` served by `connects` sessions.
+        """
+        stats = {}
+        for server, sessions in self.servers.items():
+            calls = sum(s.calls for s in sessions)
+            connects = sum(s.connects for s in sessions)
+            stats[server] = {
+                "sessions": len(sessions),
+                "connected": sum(s.connected for s in sessions),
+                "calls": calls,
+                "connects": connects,
+                "reconnects": sum(s.reconnects for s in sessions),
+                "failures": sum(s.failures for s in sessions),
+                "calls_per_connect": round(calls / connects, 1) if connects else None,
+                "last_error": next((s.last_error for s in sessions if s.last_error), None),
+            }
+        return stats
@@ -0,0 +1,307 @@
+import os
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from core.serving import WORKER_ID_ENV
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self, const: dict = None) -> list[str]:
+        const = const or {}
+        names = tuple(const) + self.labels
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                values = tuple(const.values()) + key
+                lines.append(f"{self.name}{_format_labels(names, values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self, const: dict = None) -> list[str]:
+        const = const or {}
+        names = tuple(const) + self.labels
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                key = tuple(const.values()) + key
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    labels = _format_labels(names + ("le",), key + (_number(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(names + ("le",), key + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                labels = _format_labels(names, key)
+                lines.append(f"{self.name}_sum{labels} {_number(series['sum'])}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text
+    exposition format. Metrics are created on first use and shared by name.
+    `const_labels` are added to every series.
+    """
+
+    def __init__(self, const_labels: dict = None):
+        self.const_labels = dict(const_labels or {})
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def histogram(
+        self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(
+            line for metric in metrics for line in metric.render(self.const_labels)
+        ) + "\n"
+
+    def _get(self, kind, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(name, help, labels, **kwargs)
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {name} already registered as {type(metric).__name__}")
+            return metric
+
+
+# Workers of one server share a port, so each scrape reaches any one of
+# them; the worker label keeps every worker's counters a separate series.
+REGISTRY = MetricsRegistry(
+    {"worker": os.environ[WORKER_ID_ENV]} if os.getenv(WORKER_ID_ENV) else None
+)
+
+TOOL_SECONDS = REGISTRY.histogram(
+    "mcp_tool_duration_seconds", "MCP tool execution time on the server.", ("tool",)
+)
+TOOL_CALLS = REGISTRY.counter("mcp_tool_calls_total", "MCP tool calls on the server.", ("tool", "status"))
+TOOL_RESPONSE_BYTES = REGISTRY.histogram(
+    "mcp_tool_response_bytes", "Serialized size of MCP tool results.", ("tool",), buckets=SIZE_BUCKETS
+)
+
+
+# Per-request trace: spans recorded by `timed` while a trace is active.
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.spans = []
+
+    def add(self, name: str, started: float, duration_s: float, **attrs):
+        self.spans.append(
+            {
+                "name": name,
+                "start_ms": round((started - self._started) * 1000, 2),
+                "duration_ms": round(duration_s * 1000, 2),
+                **attrs,
+            }
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+    def dump(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.id[:8]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+
+@contextmanager
+def start_trace(name: str):
+    """
+    Activates a trace for the current context. Tasks started inside inherit it,
+    so their spans land in the same trace.
+    """
+    trace = Trace(name)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def timed(histogram: Histogram, span: str = None, **labels):
+    """
+    Observes the duration of the block and records it as a span of the active
+    trace, if any.
+    """
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        histogram.observe(duration, **labels)
+        trace = _trace.get()
+        if trace is not None:
+            attrs = {**labels, "error": error} if error else labels
+            trace.add(span or histogram.name, started, duration, **attrs)
+
+
+def instrument(histogram: Histogram, span: str = None, **labels):
+    """
+    Decorator form of `timed` for sync and async functions. The wrapper keeps
+    the signature, so frameworks that introspect it keep working.
+    """
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(histogram, span, **labels):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(histogram, span, **labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_tool(fn):
+    """
+    Records latency, outcome and result size of an MCP tool function. Apply
+    below @mcp.tool so the registered function is the instrumented one.
+    """
+    name = fn.__name__
+
+    def record(result, started):
+        TOOL_SECONDS.observe(time.perf_counter() - started, tool=name)
+        TOOL_RESPONSE_BYTES.observe(len(json.dumps(result, default=str)), tool=name)
+        TOOL_CALLS.inc(tool=name, status="ok")
+        return result
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return record(await fn(*args, **kwargs), started)
+            except Exception:
+                TOOL_CALLS.inc(tool=name, status="error")
+                raise
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return record(fn(*args, **kwargs), started)
+        except Exception:
+            TOOL_CALLS.inc(tool=name, status="error")
+            raise
+
+    return wrapper
+
+
+def add_metrics_route(mcp):
+    """
+    Serves REGISTRY at GET /metrics on a FastMCP server's HTTP app.
+    """
+    from starlette.requests import Request
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request):
+        return metrics_response()
+
+
+def metrics_response():
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def _label_key(names: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in names)
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
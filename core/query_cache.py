@@ -0,0 +1,116 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from core.sql_utils import normalize_sql, extract_tables
+
+
+class QueryResultCache:
+    """
+    In-memory LRU cache of SQL results keyed by normalized SQL text (plus any
+    paging parameters). Entries expire after `ttl` seconds, the cache is bounded
+    by the approximate JSON size of its results, and every entry is indexed by
+    the tables its query reads so a table change can drop just those entries.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_bytes: int = 32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, query: str, *params) -> str:
+        return json.dumps([normalize_sql(query), *params], separators=(",", ":"))
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.monotonic() > entry["expires_at"]:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    def set(self, key: str, query: str, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        tables = extract_tables(query)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "value": value,
+                "tables": tables,
+                "size": size,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_table(self, table: str) -> int:
+        """
+        Drops every cached result whose query reads `table`.
+        """
+        with self._lock:
+            keys = list(self._by_table.get(table.strip("`").lower(), ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+            self.invalidations += count
+            return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+        for table in entry["tables"]:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
@@ -0,0 +1,60 @@
+import os
+import socket
+import asyncio
+
+# Set by start_servers.py for the workers it supervises.
+LISTEN_FD_ENV = "MCP_LISTEN_FD"
+READY_FD_ENV = "MCP_READY_FD"
+WORKER_ID_ENV = "MCP_WORKER_ID"
+
+
+def add_ready_route(mcp, ready=None):
+    """
+    Serves GET /ready on a FastMCP server's HTTP app: 200 when `ready()`
+    (default: always) is true, 503 otherwise.
+    """
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+
+    @mcp.custom_route("/ready", methods=["GET"])
+    async def ready_probe(request: Request):
+        ok = ready is None or bool(ready())
+        return JSONResponse(
+            {"ready": ok, "worker": os.getenv(WORKER_ID_ENV), "pid": os.getpid()},
+            status_code=200 if ok else 503,
+        )
+
+
+def serve_http(mcp, host: str = "127.0.0.1", port: int = 8000, ready=None):
+    """
+    Runs a FastMCP server over stateless streamable HTTP. Started by the supervisor,
+    the worker serves the listening socket it inherited (MCP_LISTEN_FD)
+    instead of binding one, and writes to MCP_READY_FD once it accepts
+    connections and `ready()` is true. Run directly, it binds host:port.
+    """
+    asyncio.run(_serve_http(mcp, host, port, ready))
+
+
+async def _serve_http(mcp, host: str, port: int, ready):
+    import uvicorn
+
+    # Stateless: workers share one socket, so consecutive requests of a client
+    # session can land on different workers and no worker may depend on
+    # session state held by another.
+    app = mcp.http_app(transport="streamable-http", stateless_http=True)
+    config = uvicorn.Config(app, host=host, port=port, timeout_graceful_shutdown=5, lifespan="on")
+    server = uvicorn.Server(config)
+
+    listen_fd = os.getenv(LISTEN_FD_ENV)
+    sockets = [socket.socket(fileno=int(listen_fd))] if listen_fd else None
+    serving = asyncio.create_task(server.serve(sockets=sockets))
+
+    ready_fd = os.getenv(READY_FD_ENV)
+    if ready_fd:
+        while not serving.done() and not (server.started and (ready is None or ready())):
+            await asyncio.sleep(0.05)
+        if not serving.done():
+            os.write(int(ready_fd), b"ready\n")
+            os.close(int(ready_fd))
+
+    await serving
@@ -0,0 +1,77 @@
+import os
+import re
+from sqlalchemy import text
+from core.sql_utils import strip_sql, has_limit, mask_literals, get_limit, set_limit
+
+
+class QueryRejected(Exception):
+    pass
+
+
+_NON_STREAMING = re.compile(
+    r"\b(group\s+by|order\s+by|distinct|having|union|count|sum|avg|min|max|group_concat)\b",
+    re.IGNORECASE,
+)
+
+
+def is_streaming(query: str) -> bool:
+    """
+    True when MySQL can stop reading as soon as LIMIT rows were produced,
+    i.e. there is a LIMIT and no sort, grouping, aggregate or union.
+    """
+    return has_limit(query) and not _NON_STREAMING.search(mask_literals(query))
+
+
+def estimate_rows_examined(plan: list[dict]) -> int:
+    """
+    Nested-loop estimate from EXPLAIN: rows are multiplied across the tables
+    of one SELECT and summed across SELECTs.
+    """
+    per_select = {}
+    for row in plan:
+        rows = int(row.get("rows") or 1)
+        per_select[row.get("id")] = per_select.get(row.get("id"), 1) * max(rows, 1)
+    return sum(per_select.values())
+
+
+def guard_query(session, query: str) -> str:
+    """
+    Runs EXPLAIN on a generated SELECT and returns the query to execute.
+    Streaming queries (LIMIT, no sort/aggregate) over an expensive plan get
+    their LIMIT tightened to SQL_GUARDED_LIMIT; other queries estimated above
+    SQL_MAX_EXAMINED_ROWS, or doing an unindexed full scan over more than
+    SQL_FULL_SCAN_ROWS rows, raise QueryRejected.
+    """
+    if session.get_bind().dialect.name != "mysql":
+        return query
+
+    max_examined = int(os.getenv("SQL_MAX_EXAMINED_ROWS", "1000000"))
+    full_scan_rows = int(os.getenv("SQL_FULL_SCAN_ROWS", "100000"))
+    guarded_limit = int(os.getenv("SQL_GUARDED_LIMIT", "100"))
+
+    plan = [dict(row) for row in session.execute(text(f"EXPLAIN {strip_sql(query)}")).mappings()]
+    examined = estimate_rows_examined(plan)
+    full_scans = [
+        row["table"]
+        for row in plan
+        if row.get("type") == "ALL" and not row.get("key") and int(row.get("rows") or 0) > full_scan_rows
+    ]
+
+    if examined <= max_examined and not full_scans:
+        return query
+
+    if is_streaming(query):
+        if get_limit(query) > guarded_limit:
+            print(f"- ⚠️ Cost guard: ~{examined} rows examined, tightening LIMIT to {guarded_limit}")
+            return set_limit(query, guarded_limit)
+        return query
+
+    if full_scans:
+        raise QueryRejected(
+            f"Query rejected: full table scan over {', '.join(full_scans)} "
+            f"(> {full_scan_rows} rows). Add a WHERE predicate on an indexed column."
+        )
+    raise QueryRejected(
+        f"Query rejected: estimated {examined} rows examined exceeds {max_examined}. "
+        "Narrow the query (indexed predicates, fewer joins) or add a LIMIT without ORDER BY/GROUP BY."
+    )
@@ -0,0 +1,301 @@
+import re
+import json
+import base64
+import datetime
+from decimal import Decimal
+
+_LIMIT_AT_END = re.compile(
+    r"\blimit\s+\d+(\s*(,|\boffset\b)\s*\d+)?\s*$", re.IGNORECASE
+)
+_ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+_LOCKING = re.compile(
+    r"\bfor\s+(update|share)\b|\block\s+in\s+share\s+mode\b", re.IGNORECASE
+)
+
+
+def strip_sql(query: str) -> str:
+    """
+    Removes comments (outside of quoted literals), surrounding whitespace and
+    trailing semicolons.
+    """
+    out = []
+    i, n = 0, len(query)
+    quote = None
+
+    while i < n:
+        ch = query[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < n:
+                out.append(query[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+            out.append(ch)
+        elif query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            out.append(" ")
+            continue
+        elif ch == "#" or _is_dash_comment(query, i):
+            end = query.find("\n", i)
+            i = n if end == -1 else end
+            out.append(" ")
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    return "".join(out).strip().rstrip(";").strip()
+
+
+def _is_dash_comment(query: str, i: int) -> bool:
+    # MySQL needs whitespace or a control character after "--"; "5--3" is 5 - (-3).
+    if not query.startswith("--", i):
+        return False
+    return i + 2 >= len(query) or query[i + 2].isspace() or ord(query[i + 2]) < 32
+
+
+_QUOTED = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""")
+
+_TOKEN = re.compile(r"`[^`]*`|'[^']*'|\w+|\S")
+
+# Keywords that open a table list / take a single table.
+_TABLE_LIST = {"from"}
+_TABLE_ONE = {"join", "straight_join", "update", "into"}
+# Keywords that end a FROM list; ON/USING conditions do not, so a comma
+# after "JOIN b ON ..." still starts another table.
+_CLAUSE_END = {
+    "where", "group", "order", "having", "limit", "union", "intersect", "except",
+    "window", "set", "values", "select", "for", "lock", "into", "partition",
+}
+# Words that may precede "(" without making it a function call.
+_NOT_FUNCTIONS = {
+    "from", "join", "straight_join", "in", "exists", "any", "all", "some", "as", "on",
+    "and", "or", "not", "select", "where", "lateral", "values", "using", "when", "then",
+    "else", "union", "intersect", "except", "with", "having", "by", "is", "like",
+}
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Canonical form used as a cache key: comments removed and whitespace
+    outside quoted literals/identifiers collapsed.
+    """
+    parts = _QUOTED.split(strip_sql(query))
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip()
+
+
+def mask_literals(query: str) -> str:
+    """
+    Replaces string literals with '' (identifiers in backticks are kept) so
+    keyword searches cannot match inside user data.
+    """
+    return _QUOTED.sub(
+        lambda m: m.group(0) if m.group(0).startswith("`") else "''", strip_sql(query)
+    )
+
+
+def top_level(query: str) -> str:
+    """
+    mask_literals(query) with everything inside parentheses blanked out, so
+    clause searches only see the outer statement.
+    """
+    out = []
+    depth = 0
+    for ch in mask_literals(query):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif depth:
+            ch = " "
+        out.append(ch)
+    return "".join(out)
+
+
+def has_order_by(query: str) -> bool:
+    """
+    True when the outer statement has an ORDER BY (window and subquery
+    orderings do not count).
+    """
+    return bool(_ORDER_BY.search(top_level(query)))
+
+
+def has_locking_clause(query: str) -> bool:
+    return bool(_LOCKING.search(top_level(query)))
+
+
+def extract_tables(query: str) -> set[str]:
+    """
+    Best-effort set of (lower-cased, unqualified) table names a statement
+    reads or writes: FROM lists including comma joins (also after
+    JOIN ... ON), JOIN, UPDATE and INTO targets, in subqueries too.
+    Derived tables are skipped, and so is FROM inside function calls such
+    as EXTRACT(YEAR FROM col) or TRIM(x FROM col).
+    """
+    tokens = _TOKEN.findall(mask_literals(query))
+    tables = set()
+    # One frame per open parenthesis: is it a function call, is a FROM
+    # list open, is the next identifier a table name.
+    stack = [{"function": False, "in_list": False, "expect": False}]
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        word = token.lower()
+        frame = stack[-1]
+
+        if token == "(":
+            previous = tokens[i - 1].lower() if i else ""
+            is_function = bool(re.fullmatch(r"\w+", previous)) and previous not in _NOT_FUNCTIONS
+            frame["expect"] = False
+            stack.append({"function": is_function, "in_list": False, "expect": False})
+        elif token == ")":
+            if len(stack) > 1:
+                stack.pop()
+        elif frame["function"]:
+            if word == "select":
+                frame["function"] = False
+        elif frame["expect"] and word != "lateral" and (token.startswith("`") or re.fullmatch(r"\w+", token)):
+            # Qualified names (db.table) keep their last part.
+            while i + 2 < len(tokens) and tokens[i + 1] == ".":
+                i += 2
+                token = tokens[i]
+            name = token.strip("`").lower()
+            if name and name != "dual":
+                tables.add(name)
+            frame["expect"] = False
+        elif word in _TABLE_LIST:
+            frame["in_list"] = frame["expect"] = True
+        elif word in _TABLE_ONE and not (word == "update" and i and tokens[i - 1].lower() in ("for", "key")):
+            frame["expect"] = True
+            frame["in_list"] = frame["in_list"] and word != "into"
+        elif word in _CLAUSE_END:
+            frame["in_list"] = frame["expect"] = False
+        elif token == ",":
+            frame["expect"] = frame["in_list"]
+        else:
+            frame["expect"] = False
+        i += 1
+
+    return tables
+
+
+def has_limit(query: str) -> bool:
+    return bool(_LIMIT_AT_END.search(strip_sql(query)))
+
+
+def get_limit(query: str) -> int | None:
+    """
+    Row count of the top-level LIMIT clause, or None if there is none.
+    """
+    match = _LIMIT_AT_END.search(strip_sql(query))
+    if not match:
+        return None
+    numbers = [int(n) for n in re.findall(r"\d+", match.group(0))]
+    # MySQL's "LIMIT offset, count" puts the row count last.
+    return numbers[-1] if "," in match.group(0) else numbers[0]
+
+
+def _check_limit_position(query: str):
+    # A LIMIT has to go before these clauses, which the helpers below never do.
+    outer = top_level(query)
+    if _LOCKING.search(outer) or (
+        outer.lstrip().lower().startswith("select") and re.search(r"\binto\b", outer, re.IGNORECASE)
+    ):
+        raise ValueError("Cannot place a LIMIT in a statement with a locking or INTO clause.")
+
+
+def set_limit(query: str, limit: int) -> str:
+    """
+    Replaces the row count of the top-level LIMIT clause (keeping any offset)
+    or appends one. Raises ValueError for statements with a locking
+    (FOR UPDATE, LOCK IN SHARE MODE) or SELECT ... INTO clause.
+    """
+    query = strip_sql(query)
+    _check_limit_position(query)
+    match = _LIMIT_AT_END.search(query)
+    if not match:
+        return f"{query} LIMIT {int(limit)}"
+    clause = match.group(0)
+    if "," in clause:
+        offset = re.findall(r"\d+", clause)[0]
+        clause = f"LIMIT {offset}, {int(limit)}"
+    else:
+        clause = re.sub(r"^limit\s+\d+", f"LIMIT {int(limit)}", clause.strip(), flags=re.IGNORECASE)
+    return f"{query[: match.start()].rstrip()} {clause}"
+
+
+def ensure_limit(query: str, limit: int) -> str:
+    """
+    Appends `LIMIT <limit>` when the statement has no top-level LIMIT clause.
+    Raises ValueError like set_limit.
+    """
+    query = strip_sql(query)
+    _check_limit_position(query)
+    if has_limit(query):
+        return query
+    return f"{query} LIMIT {int(limit)}"
+
+
+def page_query(query: str, offset: int, page_size: int) -> str:
+    """
+    Narrows a SELECT to one page (plus one look-ahead row) starting `offset`
+    rows into its result, within its own LIMIT window. The statement is kept
+    as it is rather than wrapped in a derived table, which MySQL rejects when
+    two selected columns share a name. Pages after the first need a
+    top-level ORDER BY, otherwise rows can repeat or go missing between
+    pages; locking reads are refused.
+    """
+    query = strip_sql(query)
+    if has_locking_clause(query):
+        raise ValueError("Locking reads (FOR UPDATE / FOR SHARE / LOCK IN SHARE MODE) are not allowed.")
+    if offset and not has_order_by(query):
+        raise ValueError("Fetching further pages requires a top-level ORDER BY.")
+
+    count = int(page_size) + 1
+    start = int(offset)
+    match = _LIMIT_AT_END.search(query)
+    if match:
+        clause = match.group(0)
+        numbers = [int(n) for n in re.findall(r"\d+", clause)]
+        if "," in clause:
+            base_offset, base_count = numbers
+        elif len(numbers) == 2:
+            base_count, base_offset = numbers
+        else:
+            base_count, base_offset = numbers[0], 0
+        count = max(0, min(count, base_count - start))
+        start += base_offset
+        query = query[: match.start()].rstrip()
+    return f"{query} LIMIT {count} OFFSET {start}"
+
+
+def encode_cursor(query: str, offset: int) -> str:
+    payload = json.dumps({"q": query, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return payload["q"], int(payload["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def to_jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
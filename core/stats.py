@@ -0,0 +1,23 @@
+import math
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile; returns 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(latencies_ms: list[float], elapsed_s: float) -> dict:
+    return {
+        "count": len(latencies_ms),
+        "throughput_per_s": round(len(latencies_ms) / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 1) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 1),
+        "p95_ms": round(percentile(latencies_ms, 95), 1),
+        "p99_ms": round(percentile(latencies_ms, 99), 1),
+    }
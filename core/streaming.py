@@ -0,0 +1,67 @@
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class ThinkFilter:
+    """
+    Removes <think>...</think> sections from text that arrives in pieces.
+    A tag split across chunks is held back until the next chunk decides it,
+    so nothing of a reasoning section leaks and nothing else is delayed
+    longer than a partial tag. Whitespace before the first visible text
+    (what reasoning models put after </think>) is dropped.
+    """
+
+    def __init__(self):
+        self.inside = False
+        self.started = False
+        self._buffer = ""
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        visible = []
+        while True:
+            tag = THINK_CLOSE if self.inside else THINK_OPEN
+            found = self._buffer.find(tag)
+            if found >= 0:
+                if not self.inside:
+                    visible.append(self._buffer[:found])
+                self._buffer = self._buffer[found + len(tag):]
+                self.inside = not self.inside
+                continue
+
+            keep = _partial_tag(self._buffer, tag)
+            if not self.inside:
+                visible.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            return self._emit("".join(visible))
+
+    def flush(self) -> str:
+        """
+        Returns text held back at the end of the stream; an unclosed
+        reasoning section is dropped.
+        """
+        rest = "" if self.inside else self._buffer
+        self._buffer = ""
+        return self._emit(rest)
+
+    def _emit(self, text: str) -> str:
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+        return text
+
+
+def strip_think(text: str) -> str:
+    """
+    What a ThinkFilter would emit for `text` arriving in one piece.
+    """
+    visible = ThinkFilter()
+    return visible.feed(text) + visible.flush()
+
+
+def _partial_tag(text: str, tag: str) -> int:
+    # Length of the longest suffix of `text` that is a proper prefix of `tag`.
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
@@ -1,89 +1,346 @@
 import yaml
 import csv
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_cohere import CohereEmbeddings
+import re
+import json
+import hashlib
+import asyncio
+from typing import Iterator
 from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from core.embeddings import get_embeddings, embedding_spec
+from core.embedding_pipeline import aembed_into_index
+from core.ann_index import IndexWriter, index_spec, read_index, write_index
+from core.doc_store import DocStore, DOC_STORE_FILE
 
+VECTOR_DB_ROOT = "vector_db"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 5
 
-def init_vector_db(file_paths: list[str], cohere_api_key: str, output_file: str = None):
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+
+def init_vector_db(
+    file_paths: list[str],
+    cohere_api_key: str,
+    output_file: str = None,
+    batch_size: int = 96,
+    max_in_flight: int = 4,
+):
+    """
+    Builds or incrementally updates a combined FAISS Vector DB from multiple files.
+    A manifest of per-file and per-chunk content hashes is kept next to the index,
+    so only the chunks that changed are embedded, added or removed.
+    New chunks are embedded in batches of `batch_size` with up to `max_in_flight`
+    concurrent requests. The FAISS index type (flat, ivf_flat, ivf_pq, hnsw)
+    comes from VECTOR_INDEX_TYPE, see core.ann_index.
+
+    Chunk text lives in a SQLite doc store next to the index. Every sync
+    writes a new generation of both files (see store_paths) and then replaces
+    the manifest, which is the single commit point: readers and a later sync
+    either see the old pair or the new one, never a mix. The vector server
+    hot-reloads when the manifest changes.
+
+    Chunk text is streamed: at most `max_in_flight` batches of it are held at
+    once. Memory is bounded by chunk ids, not chunk text: the manifest's
+    per-file id lists, the doc store's id map and the per-file duplicate
+    counters in iter_file_chunks still grow with the number of chunks.
+    """
     try:
-        print("- 🕞 Creating a single combined FAISS Vector DB from multiple files...")
+        output_path = VECTOR_DB_ROOT
+
+        if output_file:
+            output_path += "/" + output_file
+
+        print(f"- 🕞 Syncing combined FAISS Vector DB at: {output_path}")
 
-        documents = []
+        settings = {
+            "embedding": embedding_spec(),
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "index": index_spec(),
+        }
+        manifest = load_manifest(output_path)
+        index_path, docs_path = store_paths(output_path, manifest)
+        index_exists = os.path.exists(index_path) and os.path.exists(docs_path)
+
+        if not index_exists or manifest.get("settings") != settings:
+            manifest = {"version": MANIFEST_VERSION, "settings": settings, "files": {}}
+            index_exists = False
+
+        previous_files = manifest["files"]
+        current_files = {}
+        changed_files = {}
 
         for file_path in file_paths:
-            ext = os.path.splitext(file_path)[-1].lower()
-
-            if ext in [".yaml", ".yml"]:
-                documents.extend(read_yaml_file(file_path))
-            elif ext == ".csv":
-                documents.extend(read_csv_file(file_path))
-            elif ext == ".txt":
-                documents.extend(read_txt_file(file_path))
-            else:
+            if os.path.splitext(file_path)[-1].lower() not in LOADERS:
                 print(f"- ⚠️ Unsupported file type: {file_path}")
                 continue
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        splits = text_splitter.split_documents(documents)
+            previous = previous_files.get(file_path)
+            entry = file_fingerprint(file_path, previous)
 
-        embeddings = CohereEmbeddings(
-            cohere_api_key=cohere_api_key, model="embed-english-light-v3.0"
-        )
-        vectorstore = FAISS.from_documents(splits, embeddings)
+            if previous and previous["sha256"] == entry["sha256"]:
+                current_files[file_path] = {**entry, "chunks": previous["chunks"]}
+            else:
+                changed_files[file_path] = entry
 
-        output_path = f"vector_db"
+        removed_paths = [
+            p for p in previous_files if p not in current_files and p not in changed_files
+        ]
 
-        if output_file: 
-            output_path += "/" + output_file
+        if index_exists and not changed_files and not removed_paths:
+            if current_files != previous_files:
+                # Only stat info moved (e.g. touched file), content hashes match.
+                manifest["files"] = current_files
+                save_manifest(output_path, manifest)
+            print(f"- ✅ FAISS vector DB is up to date: {output_path}")
+            return
+
+        stale_ids = set()
+        for file_path in list(changed_files) + removed_paths:
+            if file_path in previous_files:
+                stale_ids.update(previous_files[file_path]["chunks"])
+
+        added = 0
 
-        vectorstore.save_local(output_path)
+        def new_chunks():
+            # Streams chunks of changed files straight into the embedding stage;
+            # only chunk ids (one per chunk of the file) are kept for the manifest.
+            nonlocal added
+            for file_path, entry in changed_files.items():
+                chunk_ids = []
+                for chunk_id, doc in iter_file_chunks(file_path):
+                    chunk_ids.append(chunk_id)
+                    if chunk_id not in stale_ids:
+                        added += 1
+                        yield chunk_id, doc
+                current_files[file_path] = {**entry, "chunks": chunk_ids}
 
-        print(f"- ✅ Single combined FAISS vector DB created at: {output_path}")
+        embeddings = get_embeddings(cohere_api_key, **settings["embedding"])
+
+        # Both kinds of sync write the next generation: incremental ones start
+        # from a copy of the current doc store, full rebuilds from an empty one.
+        generation = manifest.get("generation", 0) + 1
+        new_index_path, new_docs_path = generation_paths(output_path, generation)
+        if os.path.exists(new_docs_path):
+            os.remove(new_docs_path)
+        docstore = DocStore.copy_of(docs_path, new_docs_path) if index_exists else DocStore(new_docs_path)
+
+        try:
+            writer = IndexWriter(
+                read_index(index_path) if index_exists else None,
+                docstore,
+                settings["index"],
+                manifest.get("index"),
+                manifest.get("sources"),
+                manifest.get("next_partition", 0),
+            )
+
+            asyncio.run(
+                aembed_into_index(
+                    writer,
+                    new_chunks(),
+                    embeddings,
+                    batch_size=batch_size,
+                    max_in_flight=max_in_flight,
+                )
+            )
+            kept_ids = {c for entry in current_files.values() for c in entry["chunks"]}
+            removed_ids = stale_ids - kept_ids
+            if removed_ids:
+                writer.remove(list(removed_ids))
+
+            # After remove(): HNSW removal swaps in a rebuilt index.
+            index = writer.close()
+            if index is not None:
+                docstore.commit()
+        finally:
+            docstore.close()
+
+        if index is None:
+            os.remove(new_docs_path)
+            print(f"- ⚠️ No documents to index for: {output_path}")
+            return
+
+        write_index(index, new_index_path)
+
+        manifest["generation"] = generation
+        manifest["files"] = current_files
+        manifest["index"] = writer.effective
+        manifest["sources"] = writer.sources
+        manifest["next_partition"] = writer.next_partition
+        save_manifest(output_path, manifest)
+        remove_old_generations(output_path, keep={generation, generation - 1})
+
+        print(
+            f"- ✅ FAISS vector DB synced at: {output_path} "
+            f"(+{added} / -{len(removed_ids)} chunks, embedding: {settings['embedding']})"
+        )
+        if hasattr(embeddings, "stats"):
+            print(f"- 📊 Embedding cache: {embeddings.stats()}")
 
     except Exception as e:
         print("- ❌ Vector DB creation failed:", e)
         raise
 
 
-def read_yaml_file(file_path: str) -> list[Document]:
+def iter_file_chunks(file_path: str):
+    """
+    Streams and splits a single file, yielding (chunk_id, Document) pairs.
+    The chunk id hashes the source, the content and its occurrence number,
+    so repeated identical chunks in the same file stay distinct; counting
+    occurrences keeps a 16-byte digest per distinct chunk of the file.
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+    loader = LOADERS[os.path.splitext(file_path)[-1].lower()]
+
+    seen = {}
+    for document in loader(file_path):
+        for doc in text_splitter.split_documents([document]):
+            digest = hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=16).digest()
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            key = f"{doc.metadata['source']}\0{occurrence}\0{doc.page_content}"
+            yield hashlib.sha256(key.encode("utf-8")).hexdigest(), doc
+
+
+def file_fingerprint(file_path: str, previous: dict = None) -> dict:
+    """
+    Returns size, mtime and sha256 of a file. The content hash is reused from the
+    previous manifest entry when size and mtime did not change.
+    """
+    stat = os.stat(file_path)
+
+    if (
+        previous
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        sha256 = previous["sha256"]
+    else:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+    return {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def generation_paths(output_path: str, generation: int) -> tuple[str, str]:
+    return (
+        os.path.join(output_path, f"index-{generation}.faiss"),
+        os.path.join(output_path, f"docs-{generation}.sqlite"),
+    )
+
+
+def store_paths(output_path: str, manifest: dict) -> tuple[str, str]:
+    """
+    (index, doc store) of the generation the manifest commits to. Directories
+    written before generations existed use fixed file names.
+    """
+    if "generation" in manifest:
+        return generation_paths(output_path, manifest["generation"])
+    return os.path.join(output_path, "index.faiss"), os.path.join(output_path, DOC_STORE_FILE)
+
+
+def remove_old_generations(output_path: str, keep: set[int]):
+    """
+    Deletes index and doc store files of other generations, and the files of
+    the pre-generation layout. The previous generation is kept for readers
+    that loaded the old manifest but have not opened its files yet; readers
+    holding files open are unaffected by the unlink.
+    """
+    for name in os.listdir(output_path):
+        match = re.fullmatch(r"(?:index|docs)-(\d+)\.(?:faiss|sqlite)", name)
+        legacy = name in ("index.faiss", DOC_STORE_FILE, "index.pkl")
+        if legacy or (match and int(match.group(1)) not in keep):
+            os.remove(os.path.join(output_path, name))
+
+
+def load_manifest(output_path: str) -> dict:
+    manifest_path = os.path.join(output_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"- ⚠️ Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(output_path: str, manifest: dict):
+    os.makedirs(output_path, exist_ok=True)
+    manifest_path = os.path.join(output_path, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def read_yaml_file(file_path: str) -> Iterator[Document]:
+    """
+    Yields one Document per top-level item. Multi-document YAML streams are
+    loaded one document at a time.
+    """
     with open(file_path, "r") as f:
-        data = yaml.safe_load(f)
-
-    documents = []
-    for item in data:
-        content = flatten_dict(item)
-        documents.append(
-            Document(
-                page_content=content, metadata={"source": os.path.basename(file_path)}
-            )
-        )
-    return documents
+        for data in yaml.safe_load_all(f):
+            if data is None:
+                continue
+            for item in data if isinstance(data, list) else [data]:
+                content = flatten_dict(item)
+                yield Document(
+                    page_content=content, metadata={"source": os.path.basename(file_path)}
+                )
 
 
-def read_csv_file(file_path: str) -> list[Document]:
-    documents = []
+def read_csv_file(file_path: str) -> Iterator[Document]:
     with open(file_path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             content = flatten_dict(row)
-            documents.append(
-                Document(
-                    page_content=content,
-                    metadata={"source": os.path.basename(file_path)},
-                )
+            yield Document(
+                page_content=content,
+                metadata={"source": os.path.basename(file_path)},
             )
-    return documents
 
 
-def read_txt_file(file_path: str) -> list[Document]:
+def read_txt_file(file_path: str, block_size: int = 64 * 1024) -> Iterator[Document]:
+    """
+    Streams a text file as blocks of roughly `block_size` characters, cut at
+    paragraph breaks where possible (or at line breaks for very long paragraphs),
+    so the splitter never sees the whole file at once.
+    """
+    source = os.path.basename(file_path)
+    lines, size = [], 0
+
     with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    return [
-        Document(page_content=content, metadata={"source": os.path.basename(file_path)})
-    ]
+        for line in f:
+            lines.append(line)
+            size += len(line)
+            at_paragraph_break = not line.strip()
+            if (at_paragraph_break and size >= block_size) or size >= 4 * block_size:
+                yield Document(page_content="".join(lines), metadata={"source": source})
+                lines, size = [], 0
+
+    if lines:
+        yield Document(page_content="".join(lines), metadata={"source": source})
+
+
+LOADERS = {
+    ".yaml": read_yaml_file,
+    ".yml": read_yaml_file,
+    ".csv": read_csv_file,
+    ".txt": read_txt_file,
+}
 
 
 def flatten_dict(d: dict, parent_key: str = "", sep: str = ".") -> str:
@@ -0,0 +1,190 @@
+import os
+import time
+import threading
+import numpy as np
+from langchain_core.documents import Document
+from core.ann_index import filtered_search_params, read_index, set_search_params
+from core.doc_store import DocStore
+from core.embeddings import get_index_embeddings
+from core.vector_db import MANIFEST_FILE, load_manifest, store_paths
+
+
+def manifest_stamp(path: str) -> tuple | None:
+    """
+    Identifies the current build of a vector DB directory. The manifest is
+    replaced (new inode) as the last step of every build.
+    """
+    try:
+        stat = os.stat(os.path.join(path, MANIFEST_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class VectorIndex:
+    """
+    Read-only view of one built vector DB directory: the FAISS index
+    (memory-mapped by default), the SQLite doc store and the embeddings it was
+    built with. Only the documents of the returned hits are read from disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cohere_api_key: str = None,
+        mmap: bool = True,
+        nprobe: int = None,
+        ef_search: int = None,
+        max_filter_expansion: float = 8.0,
+    ):
+        self.path = path
+        self.max_filter_expansion = max_filter_expansion
+        self.stamp = manifest_stamp(path)
+        self.manifest = load_manifest(path)
+        self.loaded_at = time.time()
+
+        index_path, docs_path = store_paths(path, self.manifest)
+        self.embeddings = get_index_embeddings(self.manifest, cohere_api_key)
+        self.index = read_index(index_path, mmap=mmap)
+        set_search_params(self.index, nprobe=nprobe, ef_search=ef_search)
+        self.docstore = DocStore(docs_path, readonly=True)
+
+    @property
+    def sources(self) -> list[str]:
+        return sorted(self.manifest.get("sources", {}))
+
+    def search(
+        self, vectors: np.ndarray, top_k: int, sources: list[str] = None
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        One FAISS search over a query matrix; returns (document, distance)
+        pairs per query, closest first. With `sources`, only the id partitions
+        of those source files are searched.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if sources:
+            distances, ids = self._filtered_search(vectors, top_k, sources)
+        else:
+            distances, ids = self.index.search(vectors, top_k)
+
+        docs = self.docstore.get(sorted({int(i) for i in ids.flat if i != -1}))
+        return [
+            [(docs[int(i)], float(d)) for d, i in zip(row_distances, row_ids) if int(i) in docs]
+            for row_distances, row_ids in zip(distances, ids)
+        ]
+
+    def _filtered_search(self, vectors: np.ndarray, top_k: int, sources: list[str]):
+        """
+        nprobe / efSearch grow with the inverse share of the index the filter
+        selects, up to max_filter_expansion times. Queries still left with
+        fewer than top_k hits are searched again at the full expansion.
+        """
+        known = self.manifest.get("sources", {})
+        selected = [known[s] for s in sources if s in known]
+        if not selected:
+            empty = np.full((len(vectors), top_k), -1, dtype=np.int64)
+            return np.full(empty.shape, np.inf, dtype=np.float32), empty
+
+        partitions = [entry["partition"] for entry in selected]
+        available = sum(entry.get("count", 0) for entry in selected) or self.index.ntotal
+        expansion = min(self.max_filter_expansion, max(1.0, self.index.ntotal / available))
+
+        params = filtered_search_params(self.index, partitions, expansion)
+        distances, ids = self.index.search(vectors, top_k, params=params)
+
+        short = (ids == -1).sum(axis=1) > max(0, top_k - available)
+        if short.any() and expansion < self.max_filter_expansion:
+            params = filtered_search_params(self.index, partitions, self.max_filter_expansion)
+            distances[short], ids[short] = self.index.search(vectors[short], top_k, params=params)
+        return distances, ids
+
+    def similarity_search(self, query: str, k: int = 5, sources: list[str] = None) -> list[Document]:
+        vector = self.embeddings.embed_query(query)
+        return [doc for doc, _ in self.search(np.asarray([vector]), k, sources)[0]]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "vectors": self.index.ntotal,
+            "index": self.manifest.get("index"),
+            "sources": self.sources,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class LiveVectorIndex:
+    """
+    Holds the current VectorIndex of a directory and swaps in a freshly loaded
+    one when a rebuild replaces the manifest. The swap is a single reference
+    assignment: searches already running keep the snapshot they started with,
+    and a failed load leaves the previous index in service.
+    Nothing is loaded on construction: the index is loaded by the watcher
+    thread right after start(), or by the first search, whichever comes first.
+    A directory that has not been built yet is picked up once it appears.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 5.0, **options):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.options = options
+        self.reloads = 0
+        self.reload_errors = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._current = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    @property
+    def current(self) -> VectorIndex:
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = VectorIndex(self.path, **self.options)
+                    print(f"- ✅ Loaded vector index {self.path} ({self._current.index.ntotal} vectors)")
+        return self._current
+
+    def reload_if_changed(self) -> bool:
+        stamp = manifest_stamp(self.path)
+        if stamp is None or (self._current is not None and stamp == self._current.stamp):
+            return False
+
+        with self._lock:
+            previous = self._current
+            if previous is not None and manifest_stamp(self.path) == previous.stamp:
+                return False
+            try:
+                fresh = VectorIndex(self.path, **self.options)
+            except Exception as e:
+                self.reload_errors += 1
+                print(f"- ⚠️ Vector index reload failed for {self.path}: {e}")
+                return False
+            self._current = fresh
+            if previous is not None:
+                self.reloads += 1
+
+        print(f"- 🔄 Loaded vector index {self.path} ({fresh.index.ntotal} vectors)")
+        return True
+
+    def start(self):
+        if self._thread:
+            return
+
+        def watch():
+            self.reload_if_changed()
+            while self.reload_interval > 0 and not self._stop.wait(self.reload_interval):
+                self.reload_if_changed()
+
+        self._thread = threading.Thread(target=watch, name=f"reload:{self.path}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        current = self._current.stats() if self._current is not None else {"path": self.path}
+        return {**current, "loaded": self.loaded, "reloads": self.reloads, "reload_errors": self.reload_errors}
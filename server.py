@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import asyncio
+import uvicorn
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+import client
+from client import (
+    start_bootstrap,
+    load_tools,
+    build_agents,
+    answer_question,
+    tool_stats,
+    close_tools,
+    answer_cache_stats,
+    invalidate_answers,
+)
+from core.metrics import metrics_response
+
+SERVE_HOST = os.getenv("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8080"))
+SERVE_MAX_CONCURRENCY = int(os.getenv("SERVE_MAX_CONCURRENCY", "16"))
+SERVE_MAX_QUEUE = int(os.getenv("SERVE_MAX_QUEUE", "256"))
+SERVE_REQUEST_TIMEOUT = float(os.getenv("SERVE_REQUEST_TIMEOUT", "120"))
+# Bootstrap stages that must be ready before /ready reports ready; questions
+# always wait for the stages of their own intent.
+SERVE_READY_STAGES = [s.strip() for s in os.getenv("SERVE_READY_STAGES", "").split(",") if s.strip()]
+
+
+class RequestLimiter:
+    """
+    Global concurrency limit with a bounded wait queue and counters for the
+    status endpoint.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def is_full(self) -> bool:
+        return self.queued >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+limiter = RequestLimiter(SERVE_MAX_CONCURRENCY, SERVE_MAX_QUEUE)
+agents = {}
+startup = {"task": None, "error": None}
+
+
+async def start_agents():
+    try:
+        agents.update(build_agents(await load_tools()))
+    except Exception as e:
+        startup["error"] = f"{type(e).__name__}: {e}"
+        print("❌ Loading tools failed: ", e)
+        return
+    print(f"✅ Accepting questions on http://{SERVE_HOST}:{SERVE_PORT}")
+
+
+def is_ready() -> bool:
+    readiness = client.readiness
+    return bool(agents) and (readiness is None or readiness.is_ready(SERVE_READY_STAGES))
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    # Bootstrap stages run in background threads and tool discovery in a task,
+    # so the server listens (and answers /ready) right away. Graphs are
+    # compiled once per process; every request reuses them.
+    start_bootstrap()
+    startup["task"] = asyncio.create_task(start_agents())
+    yield
+    startup["task"].cancel()
+    await close_tools()
+
+
+async def read_json(request: Request) -> dict | None:
+    """
+    The request body as a JSON object ({} when empty), or None when it is
+    not one.
+    """
+    raw = await request.body()
+    if not raw.strip():
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def invalid_body() -> JSONResponse:
+    return JSONResponse({"error": "Request body must be a JSON object."}, status_code=400)
+
+
+async def ask(request: Request) -> JSONResponse:
+    body = await read_json(request)
+    if body is None:
+        return invalid_body()
+    question = str(body.get("question", "")).strip()
+    if not question:
+        return JSONResponse({"error": "Missing 'question'."}, status_code=400)
+
+    if not agents:
+        return JSONResponse({"error": "Server is starting, try again later."}, status_code=503)
+
+    if limiter.is_full():
+        limiter.rejected += 1
+        return JSONResponse({"error": "Server busy, try again later."}, status_code=503)
+
+    started = time.perf_counter()
+    async with limiter.slot():
+        try:
+            result = await asyncio.wait_for(
+                answer_question(agents, question, trace=bool(body.get("trace"))),
+                timeout=SERVE_REQUEST_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            limiter.timeouts += 1
+            return JSONResponse({"error": "Request timed out."}, status_code=504)
+        except Exception as e:
+            limiter.failed += 1
+            print("❌ Agent invocation failed: ", e)
+            return JSONResponse({"error": f"Agent invocation failed: {e}"}, status_code=500)
+
+    limiter.completed += 1
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return JSONResponse(result)
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def ask_stream(request: Request):
+    """
+    Same as /ask, answered as server-sent events: "token" events with the
+    answer text as it is generated, then one "done" event with the full
+    result (or an "error" event).
+    """
+    body = await read_json(request)
+    if body is None:
+        return invalid_body()
+    question = str(body.get("question", "")).strip()
+    if not question:
+        return JSONResponse({"error": "Missing 'question'."}, status_code=400)
+
+    if not agents:
+        return JSONResponse({"error": "Server is starting, try again later."}, status_code=503)
+
+    if limiter.is_full():
+        limiter.rejected += 1
+        return JSONResponse({"error": "Server busy, try again later."}, status_code=503)
+
+    async def events():
+        started = time.perf_counter()
+        async with limiter.slot():
+            tokens = asyncio.Queue()
+            task = asyncio.create_task(
+                asyncio.wait_for(
+                    answer_question(
+                        agents, question, trace=bool(body.get("trace")), on_token=tokens.put_nowait
+                    ),
+                    timeout=SERVE_REQUEST_TIMEOUT,
+                )
+            )
+            # None marks the end of the answer, whatever its outcome.
+            task.add_done_callback(lambda _: tokens.put_nowait(None))
+            try:
+                while (text := await tokens.get()) is not None:
+                    yield sse("token", {"text": text})
+
+                try:
+                    result = task.result()
+                except asyncio.TimeoutError:
+                    limiter.timeouts += 1
+                    yield sse("error", {"error": "Request timed out."})
+                    return
+                except Exception as e:
+                    limiter.failed += 1
+                    print("❌ Agent invocation failed: ", e)
+                    yield sse("error", {"error": f"Agent invocation failed: {e}"})
+                    return
+
+                limiter.completed += 1
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                yield sse("done", result)
+            finally:
+                # Client went away or the stream ended: never leave the graph running.
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def metrics(request: Request):
+    return metrics_response()
+
+
+def bootstrap_status() -> dict:
+    readiness = client.readiness
+    return {
+        **(readiness.stats() if readiness else {}),
+        "tools_loaded": bool(agents),
+        "startup_error": startup["error"],
+    }
+
+
+async def ready(request: Request) -> JSONResponse:
+    """
+    Readiness probe: 200 once questions are accepted, 503 before.
+    """
+    return JSONResponse(
+        {"ready": is_ready(), "bootstrap": bootstrap_status()},
+        status_code=200 if is_ready() else 503,
+    )
+
+
+async def status(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {
+            "ready": is_ready(),
+            "bootstrap": bootstrap_status(),
+            **limiter.stats(),
+            "mcp": tool_stats(),
+            "answer_cache": answer_cache_stats(),
+        }
+    )
+
+
+async def invalidate_answer_cache(request: Request) -> JSONResponse:
+    """
+    Body {"table": "orders"} and/or {"intent": "db_search"} drops matching
+    cached answers; an empty body clears the cache.
+    """
+    body = await read_json(request)
+    if body is None:
+        return invalid_body()
+    removed = invalidate_answers(intent=body.get("intent"), table=body.get("table"))
+    return JSONResponse({"removed": removed})
+
+
+app = Starlette(
+    routes=[
+        Route("/ask", ask, methods=["POST"]),
+        Route("/ask/stream", ask_stream, methods=["POST"]),
+        Route("/status", status, methods=["GET"]),
+        Route("/ready", ready, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/cache/invalidate", invalidate_answer_cache, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=SERVE_HOST, port=SERVE_PORT)
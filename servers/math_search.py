@@ -1,4 +1,5 @@
 from fastmcp import FastMCP
+from core.metrics import add_metrics_route, instrument_tool
 
 mcp = FastMCP("Math Server")
 
@@ -7,7 +8,8 @@ mcp = FastMCP("Math Server")
     name="math_add",
     description="Adds two numbers and returns the result. Use this for simple or complex addition operations.",
 )
-def add(a: int, b: int) -> int:
+@instrument_tool
+def math_add(a: int, b: int) -> int:
     print(f"🔥 Math add tool called with numbers: {a} and {b}")
     return a + b
 
@@ -16,7 +18,8 @@ def add(a: int, b: int) -> int:
     name="math_multiply",
     description="Multiplies two numbers and returns the result. Use for any arithmetic requiring product calculation.",
 )
-def multiply(a: int, b: int) -> int:
+@instrument_tool
+def math_multiply(a: int, b: int) -> int:
     print(f"🔥 Math multiply tool called with numbers: {a} and {b}")
     return a * b
 
@@ -25,12 +28,18 @@ def multiply(a: int, b: int) -> int:
     name="math_divide",
     description="Divides the first number by the second and returns the result. Do not use if the second number is zero.",
 )
-def divide(a: int, b: int) -> float:
+@instrument_tool
+def math_divide(a: int, b: int) -> float:
     print(f"🔥 Math divide tool called with numbers: {a} and {b}")
     if b == 0:
         raise ValueError("Cannot divide by zero")
     return a / b
 
 
+# Served only when the server runs over HTTP; under stdio (how the client
+# starts it) the tool metrics are kept in the server process.
+add_metrics_route(mcp)
+
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
@@ -1,7 +1,38 @@
 from fastmcp import FastMCP
-from core.db_connector import get_session
+from core.metrics import add_metrics_route, instrument_tool
+from core.serving import add_ready_route, serve_http
+from core.db_connector import get_async_session, get_async_pool_capacity
 import traceback
 from sqlalchemy import text
+from core.sql_utils import (
+    strip_sql,
+    has_limit,
+    ensure_limit,
+    has_order_by,
+    has_locking_clause,
+    page_query,
+    encode_cursor,
+    decode_cursor,
+    to_jsonable,
+)
+from core.query_cache import QueryResultCache
+from core.sql_guard import guard_query, QueryRejected
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+import json
+import os
+import asyncio
+
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "200"))
+SQL_MAX_BYTES = int(os.getenv("SQL_MAX_BYTES", "65536"))
+SQL_AUTO_LIMIT = int(os.getenv("SQL_AUTO_LIMIT", "1000"))
+
+query_cache = QueryResultCache(
+    ttl=float(os.getenv("SQL_CACHE_TTL", "60")),
+    max_bytes=int(os.getenv("SQL_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+_query_slots = None
 
 mcp = FastMCP("SQL Server")
 
@@ -10,6 +41,7 @@ mcp = FastMCP("SQL Server")
     name="generate_sql_query",
     description="Given a user question, table description and the database schema, return a safe SQL SELECT query to answer it.",
 )
+@instrument_tool
 def generate_sql_query(question: str, schema: str) -> str:
     """ "
     The LLM uses this tool to convert a user question into a SQL SELECT query.
@@ -19,26 +51,149 @@ def generate_sql_query(question: str, schema: str) -> str:
 
 @mcp.tool(
     name="query_database",
-    description="Run SQL SELECT queries on the customer database. Only SELECT allowed.",
+    description="Run SQL SELECT queries on the customer database. Only SELECT allowed. "
+    "Returns {columns, rows, row_count, truncated, next_cursor, limited}; pass next_cursor back "
+    "as `cursor` to fetch the next page. limited=true means the result stopped at the automatic "
+    "row limit and is not complete.",
 )
-def query_database(query: str) -> list:
+@instrument_tool
+async def query_database(query: str = "", cursor: str = None, max_rows: int = None) -> dict:
 
     print("🔥 SQL tool called with raw query param : " + query)
 
-    if not query.strip().lower().startswith("select"):
-        return ["Only SELECT queries allowed."]
+    if cursor:
+        try:
+            query, offset = decode_cursor(cursor)
+        except ValueError as e:
+            return {"error": str(e)}
+        if offset and not has_order_by(query):
+            return {"error": "Fetching further pages requires a top-level ORDER BY."}
+    else:
+        offset = 0
+
+    if not strip_sql(query).lower().startswith("select"):
+        return {"error": "Only SELECT queries allowed."}
+    if has_locking_clause(query):
+        return {"error": "Locking reads (FOR UPDATE / FOR SHARE / LOCK IN SHARE MODE) are not allowed."}
+
+    page_size = min(max_rows or SQL_MAX_ROWS, SQL_MAX_ROWS)
+    query = strip_sql(query)
+
+    cache_key = query_cache.key(query, offset, page_size)
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        print("⚡ SQL result cache hit")
+        return cached
+
+    async with get_query_slots():
+        try:
+            async with get_async_session() as session:
+                # The cost guard judges the statement as generated: with the
+                # automatic LIMIT added first, every query would look like a
+                # streaming one and none could be rejected.
+                guarded = await session.run_sync(guard_query, query)
+                # Cursors carry the statement without the automatic LIMIT, so
+                # every page knows whether it was added.
+                auto_limited = not has_limit(guarded)
+                limited = ensure_limit(guarded, SQL_AUTO_LIMIT)
+                result = await session.stream(text(page_query(limited, offset, page_size)))
+                page = await read_page(result, guarded, offset, page_size)
+            # The look-ahead row comes from inside the automatic LIMIT, so a
+            # result that reached it may still have more rows.
+            page["limited"] = (
+                auto_limited and not page["truncated"] and offset + page["row_count"] >= SQL_AUTO_LIMIT
+            )
+            if page["limited"]:
+                page["note"] = (
+                    f"Stopped at the automatic limit of {SQL_AUTO_LIMIT} rows; more rows may exist. "
+                    "Narrow the query or aggregate instead."
+                )
+            query_cache.set(cache_key, query, page)
+            return page
+        except QueryRejected as e:
+            print("⛔", e)
+            return {"error": str(e), "rejected": True}
+        except Exception as e:
+            print("❌ Query execution error:", e)
+            traceback.print_exc()
+            return {"error": f"Query execution failed: {e}"}
+
+
+def get_query_slots() -> asyncio.Semaphore:
+    """
+    Limits concurrent queries to SQL_MAX_CONCURRENCY, defaulting to the async
+    pool capacity, so callers queue here instead of timing out on the pool.
+    """
+    global _query_slots
+    if _query_slots is None:
+        limit = int(os.getenv("SQL_MAX_CONCURRENCY", "0")) or get_async_pool_capacity()
+        _query_slots = asyncio.Semaphore(limit)
+    return _query_slots
+
+
+async def read_page(result, query: str, offset: int, page_size: int) -> dict:
+    """
+    Reads at most `page_size` rows / SQL_MAX_BYTES of JSON from a server-side
+    cursor into a columnar payload. A cursor to the next page is only handed
+    out for queries with a top-level ORDER BY, the only ones whose pages are
+    stable across separate executions.
+    """
+    columns = list(result.keys())
+    rows = []
+    size = 0
+    truncated = False
+
+    while len(rows) < page_size and not truncated:
+        batch = await result.fetchmany(min(100, page_size - len(rows)))
+        if not batch:
+            break
+        for row in batch:
+            values = [to_jsonable(v) for v in row]
+            size += len(json.dumps(values, default=str))
+            if rows and size > SQL_MAX_BYTES:
+                truncated = True
+                break
+            rows.append(values)
+
+    if not truncated:
+        # page_query fetches one look-ahead row to know if more pages exist.
+        truncated = await result.fetchone() is not None
+    await result.close()
+
+    page = {
+        "columns": columns,
+        "rows": rows,
+        "row_count": len(rows),
+        "truncated": truncated,
+        "next_cursor": None,
+    }
+    if truncated and has_order_by(query):
+        page["next_cursor"] = encode_cursor(query, offset + len(rows))
+    elif truncated:
+        page["note"] = "More rows exist; add an ORDER BY on a unique key to page through them."
+    return page
+
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats(request: Request) -> JSONResponse:
+    return JSONResponse(query_cache.stats())
+
+
+@mcp.custom_route("/cache/invalidate", methods=["POST"])
+async def cache_invalidate(request: Request) -> JSONResponse:
+    """
+    Body {"table": "orders"} drops entries reading that table; an empty body
+    clears the whole cache.
+    """
+    body = await request.json() if await request.body() else {}
+    table = body.get("table")
+    removed = query_cache.invalidate_table(table) if table else query_cache.clear()
+    return JSONResponse({"removed": removed, "table": table})
+
 
-    try:
-        session = get_session()
-        result = session.execute(text(query.query))
-        rows = result.mappings().all()
-        return rows
-    except Exception as e:
-        print("❌ Query execution error:", e)
-        traceback.print_exc()
-    finally:
-        session.close()
+add_metrics_route(mcp)
+add_ready_route(mcp)
 
 
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http", host="127.0.0.1", port=8001)
+    serve_http(mcp, host="127.0.0.1", port=8001)
@@ -1,8 +1,14 @@
 from fastmcp import FastMCP
-from langchain_community.vectorstores import FAISS
-from langchain_cohere import CohereEmbeddings
+from core.metrics import add_metrics_route, instrument_tool
+from core.serving import add_ready_route, serve_http
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from core.embedding_cache import embed_queries
+from core.vector_index import LiveVectorIndex, manifest_stamp
 from dotenv import load_dotenv
 import os
+import asyncio
+import numpy as np
 
 load_dotenv()
 
@@ -14,33 +20,33 @@ if cohere_api_key:
 
 mcp = FastMCP("Vector Search Server")
 
-embeddings = CohereEmbeddings(
-    cohere_api_key=cohere_api_key, model="embed-english-light-v3.0"
-)
-
-vectorstore = FAISS.load_local(
-    VECTOR_STORE_PATH,
-    embeddings,
-    allow_dangerous_deserialization=True,
-)
+INDEX_OPTIONS = {
+    "cohere_api_key": cohere_api_key,
+    "mmap": os.getenv("VECTOR_INDEX_MMAP", "true").lower() == "true",
+    "nprobe": int(os.getenv("VECTOR_NPROBE", "16")),
+    "ef_search": int(os.getenv("VECTOR_EF_SEARCH", "64")),
+    "max_filter_expansion": float(os.getenv("VECTOR_FILTER_MAX_EXPANSION", "8")),
+    "reload_interval": float(os.getenv("VECTOR_RELOAD_INTERVAL", "5")),
+}
 
-vectorstore_tables = FAISS.load_local(
-    VECTOR_STORE_PATH + "/table_descriptions",
-    embeddings,
-    allow_dangerous_deserialization=True,
-)
+VECTORSTORES = {
+    "knowledge": LiveVectorIndex(VECTOR_STORE_PATH, **INDEX_OPTIONS),
+    "tables": LiveVectorIndex(VECTOR_STORE_PATH + "/table_descriptions", **INDEX_OPTIONS),
+}
 
 
 @mcp.tool(
     name="vector_knowledge_search",
     description="Use this tool to retrieve relevant information from indexed documents using vector-based semantic search. "
     "It includes content on solar energy, database concepts, and table schemas. "
-    "Ideal for answering domain-specific or technical knowledge questions before deciding on other actions like SQL query generation.",
+    "Ideal for answering domain-specific or technical knowledge questions before deciding on other actions like SQL query generation. "
+    "Optionally pass `sources` (file names such as 'data.csv') to search only those documents.",
 )
-def vector_knowledge_search(query: str, top_k: int = 5) -> list:
-    print(f"🔍 Searching vector DB: {query}")
+@instrument_tool
+def vector_knowledge_search(query: str, top_k: int = 5, sources: list[str] = None) -> list:
+    print(f"🔍 Searching vector DB: {query}" + (f" in {sources}" if sources else ""))
     try:
-        results = vectorstore.similarity_search(query, k=top_k)
+        results = VECTORSTORES["knowledge"].current.similarity_search(query, k=top_k, sources=sources)
         return [doc.page_content for doc in results]
     except Exception as e:
         return [f"❌ Error during vector search: {str(e)}"]
@@ -50,16 +56,105 @@ def vector_knowledge_search(query: str, top_k: int = 5) -> list:
     name="vector_table_search",
     description="Use this tool to understand the structure of the database. "
     "It performs semantic search over vectorized table descriptions to retrieve details "
-    "about table names, column types, and relationships. Useful before generating SQL queries.",
+    "about table names, column types, and relationships. Useful before generating SQL queries. "
+    "Optionally pass `sources` (file names) to search only those descriptions.",
 )
-def vector_table_search(query: str, top_k: int = 5) -> list:
-    print(f"🔍 Searching vector DB Tables: {query}")
+@instrument_tool
+def vector_table_search(query: str, top_k: int = 5, sources: list[str] = None) -> list:
+    print(f"🔍 Searching vector DB Tables: {query}" + (f" in {sources}" if sources else ""))
     try:
-        results = vectorstore_tables.similarity_search(query, k=top_k)
+        results = VECTORSTORES["tables"].current.similarity_search(query, k=top_k, sources=sources)
         return [doc.page_content for doc in results]
     except Exception as e:
         return [f"❌ Error during vector search: {str(e)}"]
 
 
+@mcp.tool(
+    name="vector_batch_search",
+    description="Run several semantic searches at once. Takes a list of queries and the indexes to search "
+    "('knowledge' for indexed documents, 'tables' for table descriptions) and returns, per query, "
+    "the top matches of each index with their distance (lower is closer). "
+    "Optionally pass `sources` (file names) to search only those documents.",
+)
+@instrument_tool
+def vector_batch_search(
+    queries: list[str], top_k: int = 5, indexes: list[str] = None, sources: list[str] = None
+) -> list:
+    indexes = indexes or ["knowledge"]
+    print(f"🔍 Batch searching {indexes} for {len(queries)} queries")
+    if not queries:
+        return []
+
+    unknown = [name for name in indexes if name not in VECTORSTORES]
+    if unknown:
+        return [f"❌ Unknown index: {', '.join(unknown)}"]
+
+    try:
+        results = [{"query": query, "results": {}} for query in queries]
+        vectors_by_space = {}
+
+        for name in indexes:
+            index = VECTORSTORES[name].current
+            # Indexes built with the same embedder share one embedding call.
+            space = id(index.embeddings)
+            if space not in vectors_by_space:
+                vectors_by_space[space] = np.asarray(
+                    embed_queries(index.embeddings, queries), dtype=np.float32
+                )
+            hits = index.search(vectors_by_space[space], top_k, sources)
+            for result, query_hits in zip(results, hits):
+                result["results"][name] = [
+                    {
+                        "content": doc.page_content,
+                        "source": doc.metadata.get("source"),
+                        "distance": distance,
+                    }
+                    for doc, distance in query_hits
+                ]
+
+        return results
+    except Exception as e:
+        return [f"❌ Error during vector search: {str(e)}"]
+
+
+@mcp.tool(
+    name="vector_list_sources",
+    description="List the source files of each vector index, for use as the `sources` filter of the search tools.",
+)
+@instrument_tool
+def vector_list_sources() -> dict:
+    return {name: live.current.sources for name, live in VECTORSTORES.items()}
+
+
+@mcp.custom_route("/index/stats", methods=["GET"])
+async def index_stats(request: Request) -> JSONResponse:
+    return JSONResponse({name: live.stats() for name, live in VECTORSTORES.items()})
+
+
+@mcp.custom_route("/index/reload", methods=["POST"])
+async def index_reload(request: Request) -> JSONResponse:
+    """
+    Checks the index directories now instead of waiting for the next poll.
+    Under start_servers.py only the worker that accepts the request reloads
+    here; the others still pick the new index up at their next poll.
+    """
+    reloaded = {
+        name: await asyncio.to_thread(live.reload_if_changed)
+        for name, live in VECTORSTORES.items()
+    }
+    return JSONResponse({"reloaded": reloaded})
+
+
+def indexes_ready() -> bool:
+    # An index directory that has not been built yet has nothing to wait for.
+    return all(live.loaded or manifest_stamp(live.path) is None for live in VECTORSTORES.values())
+
+
+add_metrics_route(mcp)
+add_ready_route(mcp, indexes_ready)
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http", host="127.0.0.1", port=8002)
+    for live in VECTORSTORES.values():
+        live.start()
+    serve_http(mcp, host="127.0.0.1", port=8002, ready=indexes_ready)
@@ -1,13 +1,20 @@
 from fastmcp import FastMCP
+from core.metrics import add_metrics_route, instrument_tool
+from core.serving import add_ready_route, serve_http
 
 mcp = FastMCP("Weather Server")
 
 
 @mcp.tool(name="get_weather", description="Get the weather location")
+@instrument_tool
 async def get_weather(location: str) -> str:
     print("🔥 Tool get_weather called with location : " + location)
     return f"The weather in {location} is mostly sunny with light breeze"
 
 
+add_metrics_route(mcp)
+add_ready_route(mcp)
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http", host="127.0.0.1", port=8000)
+    serve_http(mcp, host="127.0.0.1", port=8000)
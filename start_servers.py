@@ -1,12 +1,305 @@
+import os
+import sys
+import time
+import yaml
+import select
+import signal
+import socket
+import argparse
 import subprocess
+from core.serving import LISTEN_FD_ENV, READY_FD_ENV, WORKER_ID_ENV
 
-servers = [
-    ("Math Server", "uv run servers/math_search.py"),
-    ("SQL Server", "python -m servers.sql_search"),
-    ("Vector Server", "uv run servers/vector_search.py"),
-    ("Weather Server", "uv run servers/weather_search.py"),
-]
 
-for name, cmd in servers:
-    print(f"Starting {name}...")
-    subprocess.Popen(cmd, shell=True)
+class Worker:
+    def __init__(self, server: str, slot: int, process: subprocess.Popen, ready_fd: int):
+        self.server = server
+        self.slot = slot
+        self.process = process
+        self.ready_fd = ready_fd
+        self.started_at = time.monotonic()
+        self.ready_at = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.server}-{self.slot}"
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def poll_ready(self) -> bool:
+        """
+        Non-blocking check of the readiness pipe; the worker writes to it once
+        it accepts connections.
+        """
+        if self.ready_at is None and self.ready_fd is not None:
+            if select.select([self.ready_fd], [], [], 0)[0]:
+                if os.read(self.ready_fd, 64):
+                    self.ready_at = time.monotonic()
+                self.close_pipe()
+        return self.ready
+
+    def close_pipe(self):
+        if self.ready_fd is not None:
+            os.close(self.ready_fd)
+            self.ready_fd = None
+
+
+class ServerGroup:
+    """
+    The workers of one MCP server and the listening socket they share, so
+    the kernel spreads connections over them and a worker can be replaced
+    without refusing a single connection.
+    """
+
+    def __init__(self, name: str, module: str, host: str, port: int, workers: int):
+        self.name = name
+        self.module = module
+        self.host = host
+        self.port = port
+        self.size = workers
+        self.workers = {}
+        self.failures = [0] * workers
+        self.restart_at = [None] * workers
+        self.restarts = 0
+        self.socket = None
+
+    def listen(self, backlog: int = 2048):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(backlog)
+
+
+class Supervisor:
+    """
+    Runs N workers per MCP server on a shared listening socket. A worker
+    counts as started once it reports readiness; crashed workers and workers
+    that miss `ready_timeout` are restarted with exponential backoff (reset
+    after `stable_after` seconds of uptime). SIGHUP replaces the workers one
+    at a time, starting each replacement before stopping the old worker;
+    SIGTERM/SIGINT stop everything. Nothing here blocks: rolling restarts
+    and stopping workers advance a step per loop iteration, so every group
+    stays supervised throughout.
+    """
+
+    def __init__(
+        self,
+        groups: list[ServerGroup],
+        ready_timeout: float = 60.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        stable_after: float = 30.0,
+        stop_timeout: float = 15.0,
+    ):
+        self.groups = groups
+        self.ready_timeout = ready_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self._stopping = False
+        self._reload = False
+        self._rollout = []
+        self._replacement = None
+        self._draining = []
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for group in self.groups:
+            group.listen()
+            print(f"🚀 Starting {group.size} x {group.name} on {group.host}:{group.port}")
+            for slot in range(group.size):
+                group.workers[slot] = self.spawn(group, slot)
+
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self.rolling_restart()
+                self.check()
+                self.advance_rollout()
+                self.reap()
+                time.sleep(0.2)
+        finally:
+            self.stop()
+
+    def spawn(self, group: ServerGroup, slot: int) -> Worker:
+        ready_r, ready_w = os.pipe()
+        env = {
+            **os.environ,
+            LISTEN_FD_ENV: str(group.socket.fileno()),
+            READY_FD_ENV: str(ready_w),
+            WORKER_ID_ENV: f"{group.name}-{slot}",
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", group.module],
+            env=env,
+            pass_fds=(group.socket.fileno(), ready_w),
+        )
+        os.close(ready_w)
+        return Worker(group.name, slot, process, ready_r)
+
+    def check(self):
+        now = time.monotonic()
+        for group in self.groups:
+            for slot in range(group.size):
+                worker = group.workers.get(slot)
+                if worker is None:
+                    if group.restart_at[slot] is not None and now >= group.restart_at[slot]:
+                        group.restart_at[slot] = None
+                        group.restarts += 1
+                        group.workers[slot] = self.spawn(group, slot)
+                    continue
+
+                if not worker.ready and worker.poll_ready():
+                    print(f"✅ {worker.id} ready (pid {worker.process.pid}, "
+                          f"{worker.ready_at - worker.started_at:.1f}s)")
+
+                code = worker.process.poll()
+                if code is not None:
+                    self.schedule_restart(group, worker, f"exited with {code}")
+                elif not worker.ready and now - worker.started_at > self.ready_timeout:
+                    self.drain(worker)
+                    self.schedule_restart(group, worker, f"not ready after {self.ready_timeout:.0f}s")
+                elif worker.ready and now - worker.started_at > self.stable_after:
+                    group.failures[slot] = 0
+
+    def schedule_restart(self, group: ServerGroup, worker: Worker, reason: str):
+        worker.close_pipe()
+        del group.workers[worker.slot]
+        group.failures[worker.slot] += 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (group.failures[worker.slot] - 1))
+        group.restart_at[worker.slot] = time.monotonic() + delay
+        print(f"❌ {worker.id} (pid {worker.process.pid}) {reason}, restarting in {delay:.1f}s")
+
+    def rolling_restart(self):
+        """
+        Queues every worker for replacement, one at a time: the new worker
+        must report ready before the old one is stopped, so capacity never
+        drops below N-1 and the shared socket keeps accepting. A replacement
+        that fails to get ready is dropped and the old worker is kept.
+        """
+        print("🔄 Rolling restart")
+        self._rollout = [(group, slot) for group in self.groups for slot in range(group.size)]
+
+    def advance_rollout(self):
+        if self._replacement is not None:
+            group, slot, fresh = self._replacement
+            if fresh.poll_ready():
+                print(f"✅ {fresh.id} replaced (pid {fresh.process.pid})")
+                old = group.workers.get(slot)
+                group.workers[slot] = fresh
+                group.restart_at[slot] = None
+                if old is not None:
+                    self.drain(old)
+            elif fresh.process.poll() is not None or time.monotonic() - fresh.started_at > self.ready_timeout:
+                print(f"❌ Replacement for {fresh.id} not ready, keeping the running worker")
+                self.drain(fresh)
+            else:
+                return
+            self._replacement = None
+
+        if self._rollout:
+            group, slot = self._rollout.pop(0)
+            self._replacement = (group, slot, self.spawn(group, slot))
+
+    def drain(self, worker: Worker):
+        """
+        SIGTERM lets uvicorn finish in-flight requests; reap() sends SIGKILL
+        after `stop_timeout`.
+        """
+        worker.close_pipe()
+        if worker.process.poll() is None:
+            worker.process.terminate()
+            self._draining.append((worker, time.monotonic() + self.stop_timeout))
+
+    def reap(self):
+        draining = []
+        for worker, deadline in self._draining:
+            if worker.process.poll() is not None:
+                continue
+            if time.monotonic() > deadline:
+                worker.process.kill()
+                worker.process.wait()
+                continue
+            draining.append((worker, deadline))
+        self._draining = draining
+
+    def stop(self):
+        workers = [w for g in self.groups for w in g.workers.values()]
+        workers += [w for w, _ in self._draining]
+        if self._replacement is not None:
+            workers.append(self._replacement[2])
+        print(f"\n🛑 Stopping {len(workers)} workers")
+        for worker in workers:
+            if worker.process.poll() is None:
+                worker.process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for worker in workers:
+            try:
+                worker.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+                worker.process.wait()
+            worker.close_pipe()
+        for group in self.groups:
+            group.workers.clear()
+            if group.socket:
+                group.socket.close()
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reload = True
+
+
+def load_groups(path: str, workers: int = None, only: list[str] = None) -> list[ServerGroup]:
+    """
+    Server groups from the config; --workers and <NAME>_WORKERS override the
+    configured worker count, but never beyond a server's `max_workers`.
+    """
+    with open(path, "r") as f:
+        config = yaml.safe_load(f)
+    groups = []
+    for name, entry in config.items():
+        if only and name not in only:
+            continue
+        count = workers or int(os.getenv(f"{name.upper()}_WORKERS") or entry.get("workers", 1))
+        if entry.get("max_workers") and count > int(entry["max_workers"]):
+            print(f"⚠️ {name} keeps per-process state, running {entry['max_workers']} worker(s) instead of {count}")
+            count = int(entry["max_workers"])
+        groups.append(
+            ServerGroup(name, entry["module"], entry.get("host", "127.0.0.1"), int(entry["port"]), count)
+        )
+    return groups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the MCP HTTP servers with N workers each, readiness checks, "
+        "restarts with backoff and rolling restarts (send SIGHUP)."
+    )
+    parser.add_argument("--config", default="config/servers.yaml")
+    parser.add_argument("--workers", type=int, help="workers per server (overrides the config)")
+    parser.add_argument("--only", nargs="+", help="run only these servers")
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--backoff-max", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    supervisor = Supervisor(
+        load_groups(args.config, args.workers, args.only),
+        ready_timeout=args.ready_timeout,
+        backoff_max=args.backoff_max,
+    )
+    print(f"🧭 Supervisor pid {os.getpid()} (SIGHUP: rolling restart)")
+    supervisor.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
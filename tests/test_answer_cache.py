@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import core.answer_cache
+from core.answer_cache import SemanticAnswerCache
+from core.embeddings import HashingEmbeddings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.answer_cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(HashingEmbeddings(dim=1024), threshold=0.9, ttl=100, max_entries=3)
+
+
+def test_similar_questions_of_the_same_intent_hit(cache):
+    cache.store("How many orders were shipped in 2004?", "db_search", "120")
+    assert cache.lookup("how many orders were shipped in 2004", "db_search")["answer"] == "120"
+    assert cache.lookup("How many orders were shipped in 2004?", "vector_search") is None
+    assert cache.lookup("Which customers live in Paris?", "db_search") is None
+
+
+def test_entries_expire(cache, clock):
+    cache.store("q one", "db_search", "a", ttl=10)
+    cache.store("q two", "db_search", "b")
+    clock.now += 50
+    assert cache.lookup("q one", "db_search") is None
+    assert cache.lookup("q two", "db_search")["answer"] == "b"
+    clock.now += 60
+    assert cache.lookup("q two", "db_search") is None
+    assert cache.stats()["stale"] == 2
+
+
+def test_entry_ttl_cannot_exceed_the_cache_ttl(cache, clock):
+    cache.store("q", "db_search", "a", ttl=1000)
+    clock.now += 101
+    assert cache.lookup("q", "db_search") is None
+
+
+def test_a_new_version_makes_entries_stale(cache):
+    cache.store("what is solar energy", "vector_search", "a", version=1)
+    assert cache.lookup("what is solar energy", "vector_search", version=1)
+    assert cache.lookup("what is solar energy", "vector_search", version=2) is None
+    assert cache.lookup("what is solar energy", "vector_search", version=1) is None
+
+
+def test_invalidate_by_table_and_intent(cache):
+    cache.store("orders per year", "db_search", "a", tables={"Orders"})
+    cache.store("customers per city", "db_search", "b", tables={"customers"})
+    cache.store("what is solar energy", "vector_search", "c")
+
+    assert cache.invalidate(table="ORDERS") == 1
+    assert cache.lookup("orders per year", "db_search") is None
+    assert cache.lookup("customers per city", "db_search")["answer"] == "b"
+
+    assert cache.invalidate(intent="vector_search") == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for question in ("first question", "second question", "third question"):
+        cache.store(question, "db_search", question)
+    cache.lookup("first question", "db_search")
+    cache.store("fourth question", "db_search", "fourth question")
+
+    assert cache.lookup("second question", "db_search") is None
+    assert cache.lookup("first question", "db_search")["answer"] == "first question"
+
+
+class FakeGraph:
+    def __init__(self, response: dict):
+        self.response = response
+
+    async def ainvoke(self, state, config=None):
+        return self.response
+
+
+@pytest.mark.parametrize(
+    "intent, response, stored_ttl",
+    [
+        ("db_search", {"sql_executed": ["SELECT * FROM orders"]}, 60),
+        ("vector_search", {}, 100),
+        ("general_llm", {"tools_used": ["get_weather"]}, None),
+    ],
+)
+def test_answer_question_stores_only_non_live_answers(monkeypatch, cache, intent, response, stored_ttl):
+    client = pytest.importorskip("client")
+
+    async def classify(question):
+        return intent
+
+    async def lookup(question, intent):
+        return None, {"vector": cache.embed(question), "version": None}
+
+    monkeypatch.setattr(client, "question_classifer", classify)
+    monkeypatch.setattr(client, "lookup_answer", lookup)
+    monkeypatch.setattr(client, "answer_cache", cache)
+    monkeypatch.setattr(client, "SQL_CACHE_TTL", 60.0)
+
+    graph = FakeGraph({"messages": [{"content": "answer"}], **response})
+    graphs = {intent: graph, "general_llm": graph}
+    asyncio.run(client.answer_question({"tools": {}, "graphs": graphs}, "question"))
+
+    entries = list(cache._entries.values())
+    if stored_ttl is None:
+        assert not entries
+    else:
+        (entry,) = entries
+        assert entry["expires_at"] - entry["stored_at"] == stored_ttl
+        assert entry["tables"] == ({"orders"} if intent == "db_search" else set())
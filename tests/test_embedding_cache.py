@@ -0,0 +1,44 @@
+import sqlite3
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from core.embedding_cache import CachedEmbeddings
+from core.embeddings import HashingEmbeddings
+
+
+def rows(path: str) -> dict:
+    with sqlite3.connect(path) as db:
+        return dict(db.execute("SELECT key, last_used FROM embeddings"))
+
+
+def test_disk_hits_do_not_write_until_the_next_store(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CachedEmbeddings(HashingEmbeddings(dim=16), cache_path=path, memory_size=0)
+    cache.embed_documents(["a", "b"])
+    stored = rows(path)
+
+    cache.embed_documents(["a"])
+    assert cache.disk_hits == 1
+    assert rows(path) == stored
+
+    cache.embed_documents(["c"])
+    after = rows(path)
+    assert after[cache._key("document", "a")] > stored[cache._key("document", "a")]
+    assert after[cache._key("document", "b")] == stored[cache._key("document", "b")]
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CachedEmbeddings(HashingEmbeddings(dim=16), cache_path=path, memory_size=0, max_disk_entries=10)
+    cache.embed_documents([f"t{i}" for i in range(10)])
+    cache.embed_documents(["t0"])
+    cache.embed_documents(["t10"])
+
+    kept = rows(path)
+    assert len(kept) == cache._disk_entries == 9
+    assert cache.evictions == 2
+    assert cache._key("document", "t0") in kept
+
+    # A second cache on the same file starts from its row count.
+    assert CachedEmbeddings(HashingEmbeddings(dim=16), cache_path=path)._disk_entries == 9
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from core.intent_classifier import ClassificationCache, LocalIntentClassifier
+
+EXAMPLES = {
+    "db_search": [
+        "How many orders were shipped last month?",
+        "List the customers in France with their credit limit.",
+        "What is the total payment amount per customer?",
+    ],
+    "vector_search": [
+        "What does the document say about solar panel efficiency?",
+        "Summarize the report on battery storage.",
+        "Explain the inverter section of the manual.",
+    ],
+}
+
+
+@pytest.fixture
+def classifier():
+    return LocalIntentClassifier(EXAMPLES, min_score=0.25, min_margin=0.1)
+
+
+def test_confident_predictions(classifier):
+    assert classifier.predict("How many orders were shipped in 2004?")[0] == "db_search"
+    assert classifier.predict("What does the report say about battery storage?")[0] == "vector_search"
+
+
+def test_unrelated_questions_are_not_classified(classifier):
+    label, score = classifier.predict("Tell me a joke about penguins")
+    assert label is None and score < 0.25
+
+
+def test_low_margin_is_not_confident():
+    # A high score is not enough when the runner-up label is just as close.
+    classifier = LocalIntentClassifier(
+        {"a": ["list the orders of customers"], "b": ["list the orders of customers please"]},
+        min_score=0.0,
+        min_margin=0.2,
+    )
+    label, score = classifier.predict("list the orders of customers")
+    assert label is None and score > 0.5
+
+
+def test_classification_cache_normalizes_and_evicts():
+    cache = ClassificationCache(max_size=2)
+    cache.set("How many  Orders?", "db_search")
+    assert cache.get("how many orders?") == "db_search"
+    cache.set("q2", "general_llm")
+    cache.set("q3", "general_llm")
+    assert cache.get("How many orders?") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_llm_is_only_asked_when_the_local_classifier_is_not_confident(monkeypatch, classifier):
+    client = pytest.importorskip("client")
+    asked = []
+
+    async def llm(question):
+        asked.append(question)
+        return "general_llm"
+
+    monkeypatch.setattr(client, "local_classifier", classifier)
+    monkeypatch.setattr(client, "intent_cache", ClassificationCache())
+    monkeypatch.setattr(client, "llm_question_classifer", llm)
+
+    assert asyncio.run(client.question_classifer("How many orders were shipped in 2004?")) == "db_search"
+    assert asyncio.run(client.question_classifer("Tell me a joke about penguins")) == "general_llm"
+    assert asyncio.run(client.question_classifer("tell me a joke about  penguins")) == "general_llm"
+    assert asked == ["Tell me a joke about penguins"]
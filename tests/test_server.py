@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import server
+from server import RequestLimiter
+
+
+def test_limiter_caps_concurrency_and_counts_the_queue():
+    async def scenario():
+        limiter = RequestLimiter(max_concurrency=2, max_queue=3)
+        release = asyncio.Event()
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request()) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert (limiter.in_flight, limiter.queued) == (2, 3)
+        assert limiter.is_full()
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 2
+        assert (limiter.in_flight, limiter.queued) == (0, 0)
+        assert not limiter.is_full()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def http(monkeypatch):
+    async def answer(agents, question, trace=False, on_token=None):
+        return {"intent": "general_llm", "answer": f"echo: {question}"}
+
+    monkeypatch.setattr(server, "agents", {"graphs": {}})
+    monkeypatch.setattr(server, "answer_question", answer)
+    monkeypatch.setattr(server, "limiter", RequestLimiter(max_concurrency=1, max_queue=1))
+    # Without the lifespan: no bootstrap, no MCP tools.
+    return TestClient(Starlette(routes=server.app.routes))
+
+
+def test_ask_answers(http):
+    response = http.post("/ask", json={"question": "hi"})
+    assert response.status_code == 200
+    assert response.json()["answer"] == "echo: hi"
+    assert server.limiter.completed == 1
+
+
+def test_full_queue_is_rejected_with_503(http):
+    server.limiter.queued = server.limiter.max_queue
+    for path in ("/ask", "/ask/stream"):
+        response = http.post(path, json={"question": "hi"})
+        assert response.status_code == 503
+    assert server.limiter.rejected == 2
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2]", b'"text"'])
+def test_malformed_bodies_are_rejected_with_400(http, body):
+    for path in ("/ask", "/ask/stream", "/cache/invalidate"):
+        assert http.post(path, content=body).status_code == 400
+
+
+def test_missing_question_is_rejected_with_400(http):
+    assert http.post("/ask", json={}).status_code == 400
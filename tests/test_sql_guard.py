@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from core.sql_guard import QueryRejected, estimate_rows_examined, guard_query, is_streaming
+
+
+class FakeSession:
+    """
+    Stands in for a MySQL session: EXPLAIN returns `plan`, anything else fails.
+    """
+
+    def __init__(self, plan: list[dict], dialect: str = "mysql"):
+        self.plan = plan
+        self.dialect = dialect
+        self.explained = []
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": type("Dialect", (), {"name": self.dialect})})()
+
+    def execute(self, statement):
+        sql = str(statement)
+        assert sql.startswith("EXPLAIN ")
+        self.explained.append(sql[len("EXPLAIN "):])
+        return type("Result", (), {"mappings": lambda _: self.plan})()
+
+
+CHEAP = [{"id": 1, "table": "orders", "type": "ref", "key": "idx", "rows": 10}]
+FULL_SCAN = [{"id": 1, "table": "orders", "type": "ALL", "key": None, "rows": 500_000}]
+JOIN = [
+    {"id": 1, "table": "orders", "type": "ALL", "key": None, "rows": 5_000},
+    {"id": 1, "table": "orderdetails", "type": "ALL", "key": None, "rows": 5_000},
+]
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setenv("SQL_MAX_EXAMINED_ROWS", "1000000")
+    monkeypatch.setenv("SQL_FULL_SCAN_ROWS", "100000")
+    monkeypatch.setenv("SQL_GUARDED_LIMIT", "100")
+
+
+@pytest.mark.parametrize(
+    "query, streaming",
+    [
+        ("SELECT * FROM orders LIMIT 10", True),
+        ("SELECT * FROM orders", False),
+        ("SELECT * FROM orders ORDER BY orderDate LIMIT 10", False),
+        ("SELECT COUNT(*) FROM orders LIMIT 10", False),
+        ("SELECT * FROM orders WHERE status = 'order by' LIMIT 10", True),
+    ],
+)
+def test_is_streaming(query, streaming):
+    assert is_streaming(query) is streaming
+
+
+def test_rows_multiply_within_a_select_and_add_across_selects():
+    assert estimate_rows_examined(JOIN) == 25_000_000
+    assert estimate_rows_examined(JOIN + [{"id": 2, "rows": 7}]) == 25_000_007
+
+
+def test_cheap_queries_pass_unchanged():
+    session = FakeSession(CHEAP)
+    assert guard_query(session, "SELECT * FROM orders WHERE id = 1") == "SELECT * FROM orders WHERE id = 1"
+    assert session.explained == ["SELECT * FROM orders WHERE id = 1"]
+
+
+def test_expensive_streaming_queries_get_a_tighter_limit():
+    session = FakeSession(FULL_SCAN)
+    assert guard_query(session, "SELECT * FROM orders LIMIT 5000") == "SELECT * FROM orders LIMIT 100"
+    assert guard_query(session, "SELECT * FROM orders LIMIT 10") == "SELECT * FROM orders LIMIT 10"
+
+
+@pytest.mark.parametrize(
+    "plan, query, reason",
+    [
+        (FULL_SCAN, "SELECT * FROM orders", "full table scan"),
+        (FULL_SCAN, "SELECT * FROM orders ORDER BY orderDate LIMIT 10", "full table scan"),
+        (JOIN, "SELECT * FROM orders, orderdetails", "rows examined"),
+    ],
+)
+def test_expensive_queries_without_a_streaming_limit_are_rejected(plan, query, reason):
+    with pytest.raises(QueryRejected, match=reason):
+        guard_query(FakeSession(plan), query)
+
+
+def test_other_databases_are_not_explained():
+    session = FakeSession(FULL_SCAN, dialect="sqlite")
+    assert guard_query(session, "SELECT * FROM orders") == "SELECT * FROM orders"
+    assert session.explained == []
@@ -0,0 +1,60 @@
+import asyncio
+import sqlite3
+import pytest
+
+pytest.importorskip("fastmcp")
+pytest.importorskip("aiosqlite")
+
+import core.db_connector
+import servers.sql_search as sql_search
+
+
+@pytest.fixture
+def query(tmp_path, monkeypatch):
+    path = tmp_path / "db.sqlite"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, a TEXT, b TEXT)")
+        db.executemany("INSERT INTO t VALUES (?, ?, ?)", [(i, f"a{i}", f"b{i}") for i in range(1, 31)])
+
+    monkeypatch.setenv("DB_URL", f"sqlite:///{path}")
+    monkeypatch.setattr(sql_search, "SQL_AUTO_LIMIT", 20)
+    monkeypatch.setattr(sql_search, "_query_slots", None)
+    sql_search.query_cache.clear()
+
+    async def run(**kwargs):
+        try:
+            return await sql_search.query_database.fn(**kwargs)
+        finally:
+            await core.db_connector.dispose_async_db_engine()
+
+    return lambda **kwargs: asyncio.run(run(**kwargs))
+
+
+def test_pages_follow_the_cursor(query):
+    first = query(query="SELECT id FROM t ORDER BY id", max_rows=8)
+    assert [r[0] for r in first["rows"]] == list(range(1, 9))
+    assert first["truncated"] and not first["limited"]
+
+    second = query(cursor=first["next_cursor"], max_rows=8)
+    assert [r[0] for r in second["rows"]] == list(range(9, 17))
+
+
+def test_results_stopped_by_the_automatic_limit_are_flagged(query):
+    page = query(query="SELECT id FROM t ORDER BY id", max_rows=50)
+    assert page["row_count"] == 20
+    assert page["truncated"] is False and page["limited"] is True
+
+    # The last page of a cursor walk is flagged too.
+    first = query(query="SELECT id FROM t ORDER BY id", max_rows=15)
+    last = query(cursor=first["next_cursor"], max_rows=15)
+    assert last["row_count"] == 5 and last["limited"] is True
+
+
+def test_complete_results_are_not_flagged(query):
+    assert query(query="SELECT id FROM t WHERE id < 20 ORDER BY id", max_rows=50)["limited"] is False
+    explicit = query(query="SELECT id FROM t ORDER BY id LIMIT 25", max_rows=50)
+    assert explicit["row_count"] == 25 and explicit["limited"] is False
+
+
+def test_locking_reads_are_refused(query):
+    assert "error" in query(query="SELECT * FROM t FOR UPDATE")
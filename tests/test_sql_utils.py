@@ -0,0 +1,123 @@
+import sqlite3
+import pytest
+
+from core.sql_utils import (
+    ensure_limit,
+    extract_tables,
+    has_locking_clause,
+    has_order_by,
+    page_query,
+    set_limit,
+)
+
+
+@pytest.fixture
+def db():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    db.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"n{i}") for i in range(1, 26)])
+    return db
+
+
+def fetch_all_pages(db, query: str, page_size: int) -> list:
+    rows, offset = [], 0
+    while True:
+        page = db.execute(page_query(query, offset, page_size)).fetchall()
+        rows += page[:page_size]
+        if len(page) <= page_size:
+            return rows
+        offset += page_size
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT id FROM t ORDER BY id", list(range(1, 26))),
+        ("SELECT id FROM t ORDER BY id LIMIT 12", list(range(1, 13))),
+        ("SELECT id FROM t ORDER BY id LIMIT 10 OFFSET 5", list(range(6, 16))),
+        ("SELECT id FROM t ORDER BY id LIMIT 5, 10", list(range(6, 16))),
+        ("SELECT id FROM t ORDER BY id LIMIT 8;", list(range(1, 9))),
+    ],
+)
+def test_pages_stay_inside_the_query_limit(db, query, expected):
+    assert [row[0] for row in fetch_all_pages(db, query, 4)] == expected
+
+
+def test_page_query_keeps_the_statement():
+    # No derived table: MySQL rejects one whose columns share a name.
+    query = "SELECT a.id, b.id FROM t a JOIN t b ON b.id = a.id ORDER BY a.id"
+    assert page_query(query, 0, 10) == f"{query} LIMIT 11 OFFSET 0"
+
+
+def test_later_pages_need_order_by():
+    assert page_query("SELECT id FROM t", 0, 10) == "SELECT id FROM t LIMIT 11 OFFSET 0"
+    with pytest.raises(ValueError):
+        page_query("SELECT id FROM t", 10, 10)
+    with pytest.raises(ValueError):
+        page_query("SELECT id, ROW_NUMBER() OVER (ORDER BY id) FROM t", 10, 10)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t WHERE id = 1 FOR UPDATE",
+        "SELECT * FROM t FOR SHARE NOWAIT",
+        "select * from t lock in share mode",
+    ],
+)
+def test_locking_reads_are_refused(query):
+    assert has_locking_clause(query)
+    with pytest.raises(ValueError):
+        page_query(query, 0, 10)
+
+
+def test_clause_detection_ignores_literals_and_subqueries():
+    assert not has_locking_clause("SELECT * FROM t WHERE name = 'for update'")
+    assert not has_order_by("SELECT * FROM (SELECT id FROM t ORDER BY id) x")
+    assert has_order_by("SELECT * FROM t -- no order\nORDER BY id")
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * FROM a JOIN b ON a.x = b.x, c WHERE c.y = 1", {"a", "b", "c"}),
+        ("SELECT * FROM a LEFT JOIN b ON (a.id = b.id), c", {"a", "b", "c"}),
+        ("SELECT EXTRACT(YEAR FROM orderDate) y, COUNT(*) FROM orders GROUP BY y", {"orders"}),
+        ("SELECT TRIM(LEADING 'x' FROM name), SUBSTRING(name FROM 2) FROM customers", {"customers"}),
+        ("SELECT * FROM `order details` od JOIN classic.`Products` p USING (id)", {"order details", "products"}),
+        ("SELECT * FROM (SELECT * FROM t1) x, t2 AS y, db.t3 z", {"t1", "t2", "t3"}),
+        ("SELECT * FROM a WHERE id IN (SELECT aid FROM b) AND EXISTS (SELECT 1 FROM c)", {"a", "b", "c"}),
+        ("SELECT COALESCE((SELECT n FROM d LIMIT 1), 0) FROM e", {"d", "e"}),
+        ("SELECT * FROM t WHERE name = 'x FROM y' -- FROM z", {"t"}),
+        ("SELECT 5--3 FROM t", {"t"}),
+        ("SELECT 1 FROM t --\nJOIN u ON 1", {"t", "u"}),
+        ("INSERT INTO t (a, b) VALUES (1, 2) ON DUPLICATE KEY UPDATE a = 1", {"t"}),
+        ("-- Generate a SQL query using schema:\n-- Question: orders from 2004?", set()),
+    ],
+)
+def test_extract_tables(query, expected):
+    assert extract_tables(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t LIMIT 5 FOR UPDATE",
+        "SELECT * FROM t LOCK IN SHARE MODE",
+        "SELECT id INTO @x FROM t",
+        "SELECT * FROM t INTO OUTFILE '/tmp/t.csv'",
+    ],
+)
+def test_limits_are_not_placed_after_trailing_clauses(query):
+    with pytest.raises(ValueError):
+        ensure_limit(query, 1000)
+    with pytest.raises(ValueError):
+        set_limit(query, 100)
+
+
+def test_limit_helpers():
+    assert ensure_limit("SELECT * FROM t;", 10) == "SELECT * FROM t LIMIT 10"
+    assert ensure_limit("SELECT * FROM t LIMIT 5", 10) == "SELECT * FROM t LIMIT 5"
+    assert set_limit("SELECT * FROM t LIMIT 20, 500", 100) == "SELECT * FROM t LIMIT 20, 100"
+    assert set_limit("SELECT * FROM t LIMIT 500 OFFSET 20", 100) == "SELECT * FROM t LIMIT 100 OFFSET 20"
+    assert ensure_limit("SELECT * FROM t WHERE note = 'for update'", 10).endswith("LIMIT 10")
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+
+from core.streaming import ThinkFilter, strip_think
+
+
+def stream(pieces: list[str]) -> str:
+    visible = ThinkFilter()
+    return "".join(visible.feed(piece) for piece in pieces) + visible.flush()
+
+
+@pytest.mark.parametrize(
+    "pieces",
+    [
+        ["<think>plan</think>\n\nThe answer."],
+        ["<thi", "nk>plan</th", "ink>  The ", "answer."],
+        ["<", "t", "h", "i", "n", "k", ">", "plan", "<", "/", "think>", "The answer."],
+        ["The ", "answer."],
+    ],
+)
+def test_reasoning_is_removed_across_chunk_boundaries(pieces):
+    assert stream(pieces) == "The answer."
+
+
+def test_partial_tags_are_held_back_until_decided():
+    visible = ThinkFilter()
+    assert visible.feed("a <thi") == "a "
+    assert visible.feed("s is not a tag") == "<this is not a tag"
+    assert visible.feed("<think>never shown") == ""
+    assert visible.flush() == ""
+
+
+def test_strip_think():
+    assert strip_think("<think>a</think>b<think>c</think>d") == "bd"
+    assert strip_think("plain") == "plain"
+
+
+def test_cached_answers_stream_without_reasoning(monkeypatch):
+    client = pytest.importorskip("client")
+
+    async def classify(question):
+        return "db_search"
+
+    async def lookup(question, intent):
+        return {"answer": "<think>reasoning</think>\n\n42 orders.", "question": question}, None
+
+    monkeypatch.setattr(client, "question_classifer", classify)
+    monkeypatch.setattr(client, "lookup_answer", lookup)
+
+    tokens = []
+    result = asyncio.run(
+        client.answer_question({"tools": {}, "graphs": {}}, "How many orders?", on_token=tokens.append)
+    )
+    assert "".join(tokens) == "42 orders."
+    assert result["cached"] == {"question": "How many orders?"}
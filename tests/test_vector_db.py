@@ -0,0 +1,141 @@
+import os
+import random
+import sqlite3
+import pytest
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("langchain")
+
+from core.ann_index import read_index
+from core.vector_db import init_vector_db, load_manifest, store_paths
+from core.vector_index import VectorIndex
+
+WORDS = "solar panel energy grid battery storage inverter sunlight cell roof module output".split()
+
+
+def write_text(path, paragraphs: int, seed: int):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(paragraphs):
+            f.write(" ".join(rng.choice(WORDS) for _ in range(60)) + ".\n\n")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EMBEDDING_BACKEND", "hashing")
+    monkeypatch.setenv("EMBEDDING_MODEL", "hashing-64")
+    monkeypatch.setenv("VECTOR_INDEX_NLIST", "8")
+    monkeypatch.setenv("VECTOR_INDEX_TRAIN_SIZE", "500")
+    monkeypatch.setenv("VECTOR_INDEX_PQ_M", "8")
+    monkeypatch.setenv("VECTOR_INDEX_HNSW_M", "8")
+    return tmp_path
+
+
+def index_state(path: str) -> tuple[int, int, int]:
+    """
+    (vectors in the index, rows in the doc store, chunks in the manifest)
+    """
+    manifest = load_manifest(path)
+    index_path, docs_path = store_paths(path, manifest)
+    index = read_index(index_path)
+    with sqlite3.connect(docs_path) as db:
+        rows = db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    chunks = sum(len(entry["chunks"]) for entry in manifest["files"].values())
+    return index.ntotal, rows, chunks
+
+
+def assert_hits_resolve(path: str, samples: int = 50):
+    """
+    Searching with a stored chunk's own text finds that chunk, i.e. FAISS
+    ids still point at the right doc-store rows.
+    """
+    index = VectorIndex(path, mmap=False, ef_search=64)
+    with sqlite3.connect(store_paths(path, index.manifest)[1]) as db:
+        contents = [row[0] for row in db.execute("SELECT content FROM chunks LIMIT ?", (samples,))]
+    for content in contents:
+        hits = index.similarity_search(content, k=1)
+        assert hits and hits[0].page_content == content
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw"])
+def test_incremental_removal(workdir, monkeypatch, index_type):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", index_type)
+    write_text("a.txt", 600, seed=1)
+    write_text("b.txt", 300, seed=2)
+
+    init_vector_db(["a.txt", "b.txt"], None)
+    built, _, _ = index_state("vector_db")
+    assert built == index_state("vector_db")[1] == index_state("vector_db")[2]
+
+    # Drop the first file (every remaining vector changes position) and shrink the other.
+    write_text("b.txt", 150, seed=2)
+    init_vector_db(["b.txt"], None)
+    ntotal, rows, chunks = index_state("vector_db")
+    assert ntotal == rows == chunks
+    assert 0 < ntotal < built
+    if index_type != "ivf_pq":  # PQ distances are approximate
+        assert_hits_resolve("vector_db")
+
+    # A no-op sync keeps the index as it is.
+    init_vector_db(["b.txt"], None)
+    assert index_state("vector_db") == (ntotal, rows, chunks)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw"])
+def test_mmap_read(workdir, monkeypatch, capsys, index_type):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", index_type)
+    write_text("a.txt", 600, seed=1)
+    init_vector_db(["a.txt"], None)
+    capsys.readouterr()
+
+    index = VectorIndex("vector_db", mmap=True)
+    assert "Cannot mmap" not in capsys.readouterr().out
+    assert index.similarity_search("solar panel energy", k=3)
+
+
+def test_sync_stages_a_new_generation(workdir, monkeypatch):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", "flat")
+    write_text("a.txt", 200, seed=1)
+    write_text("b.txt", 200, seed=2)
+    init_vector_db(["a.txt", "b.txt"], None)
+
+    reader = VectorIndex("vector_db", mmap=True)
+    before = reader.index.ntotal
+    old_paths = store_paths("vector_db", reader.manifest)
+
+    init_vector_db(["a.txt"], None)
+    manifest = load_manifest("vector_db")
+    assert store_paths("vector_db", manifest) != old_paths
+    assert all(os.path.exists(p) for p in old_paths)
+
+    # The reader of the old generation still resolves every hit.
+    assert reader.index.ntotal == before
+    hits = reader.search(reader.embeddings.embed_documents(["battery storage"]), 10)[0]
+    assert len(hits) == 10
+
+    init_vector_db(["b.txt"], None)
+    assert not any(os.path.exists(p) for p in old_paths)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+def test_source_filter(workdir, monkeypatch, index_type):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", index_type)
+    write_text("a.txt", 900, seed=1)
+    write_text("b.txt", 20, seed=2)
+    init_vector_db(["a.txt", "b.txt"], None)
+
+    index = VectorIndex("vector_db", mmap=False, nprobe=1, ef_search=16)
+    assert index.sources == ["a.txt", "b.txt"]
+    assert index.manifest["sources"]["b.txt"]["count"] == 20
+
+    queries = index.embeddings.embed_documents(["solar panel", "battery storage", "roof module"])
+    for hits in index.search(queries, 5, sources=["b.txt"]):
+        assert len(hits) == 5
+        assert {doc.metadata["source"] for doc, _ in hits} == {"b.txt"}
+
+    # Dropped files disappear from the sources; their partition is not reused.
+    init_vector_db(["a.txt"], None)
+    manifest = load_manifest("vector_db")
+    assert list(manifest["sources"]) == ["a.txt"]
+    assert manifest["next_partition"] == 2